@@ -0,0 +1,126 @@
+import mmap
+import struct
+import sys
+from array import array
+from itertools import chain, repeat
+from operator import gt, sub
+
+# the graph files shared by all the labs: the text formats of read_graph_from_file and the binary graph format (see
+# write_binary_graph in lab 1). Every lab puts the root of the repository on sys.path and imports this module.
+
+# the binary graph format: a header, followed by arrays of 8-byte integers
+BINARY_MAGIC = b'GRAPHCSR'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<8sIIqq')     # magic, version, flags, n, m
+IDENTITY_VERTICES = 1     # flag: the vertices are 0, 1, ..., n-1, so the file has no array of vertices
+BIG_ENDIAN = 2            # flag: the arrays were written in big-endian byte order
+
+
+def parse_graph_file(filename, chunk_size=1 << 24):
+    '''
+    Parses a graph file written in one of the two formats accepted by read_graph_from_file. Instead of reading the
+file line by line, it is read in chunks of chunk_size characters and every chunk is converted at once into an array
+of integers (a chunk is cut after its last whitespace, so that no number is split between two chunks).
+    Returns (vertices, sources, targets, costs): the vertices of the graph (in the order in which they appear in the
+file) and three arrays, such that the i-th edge goes from sources[i] to targets[i] and has the cost costs[i].
+    '''
+    values = array('q')
+    with open(filename) as f:
+        header = f.readline().split()
+        rest = ''
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            chunk = rest + chunk
+            cut = max(chunk.rfind(' '), chunk.rfind('\n')) + 1
+            values.extend(map(int, chunk[:cut].split()))
+            rest = chunk[cut:]
+        values.extend(map(int, rest.split()))
+    if len(header) == 2:
+        # the first line contains n and m: the vertices are all the numbers in range (0, n) and the next m lines
+        # contain the edges
+        n, m = int(header[0]), int(header[1])
+        values = values[:3 * m]
+        return list(range(n)), values[0::3], values[1::3], values[2::3]
+    # else, the first line is already an edge. The isolated vertices were stored with the format:
+    # the_isolated_vertex -1 0
+    values[0:0] = array('q', map(int, header))
+    values = values[:len(values) - len(values) % 3]
+    sources, targets, costs = values[0::3], values[1::3], values[2::3]
+    vertices = dict.fromkeys(chain.from_iterable(zip(sources, targets)))
+    vertices.pop(-1, None)
+    if -1 in targets:
+        edges = [i for i, y in enumerate(targets) if y != -1]
+        sources = array('q', [sources[i] for i in edges])
+        targets = array('q', [targets[i] for i in edges])
+        costs = array('q', [costs[i] for i in edges])
+    return list(vertices), sources, targets, costs
+
+
+def is_binary_graph_file(filename):
+    # a binary graph file starts with the magic string of the format
+    with open(filename, 'rb') as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def map_binary_graph_file(filename):
+    # the whole file, memory-mapped read only: all the processes which map the same file share its pages
+    with open(filename, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _check_binary_graph_sections(n, m, out_offsets, out_targets, out_costs, in_offsets, in_sources, in_costs):
+    # in both directions, the offsets go from 0 to m without decreasing and the neighbours are indices of vertices, so
+    # a corrupt file raises a ValueError instead of an IndexError (or wrong answers) later
+    for offsets, neighbours in ((out_offsets, out_targets), (in_offsets, in_sources)):
+        if offsets[0] != 0 or offsets[n] != m or any(map(gt, offsets[:n], offsets[1:])):
+            raise ValueError("The binary graph file is corrupt!")
+        if m > 0 and (min(neighbours) < 0 or max(neighbours) >= n):
+            raise ValueError("The binary graph file is corrupt!")
+
+
+def binary_graph_views(buffer):
+    '''
+    Checks a buffer in the binary graph format (the header, the length, the offsets and the neighbours) and returns
+its sections without copying them: the vertices (a range for the vertices 0, 1, ..., n-1), then the outbound offsets,
+targets and costs and the inbound offsets, sources and costs, as views over the buffer. These are the arguments of
+FrozenDirectedGraph in labs 1 and 3.
+    '''
+    if len(buffer) < BINARY_HEADER.size:
+        raise ValueError("This is not a binary graph file!")
+    magic, version, flags, n, m = BINARY_HEADER.unpack_from(buffer, 0)
+    if magic != BINARY_MAGIC:
+        raise ValueError("This is not a binary graph file!")
+    if version != BINARY_VERSION:
+        raise ValueError("Unsupported version of the binary graph format: " + str(version))
+    if bool(flags & BIG_ENDIAN) != (sys.byteorder == 'big'):
+        raise ValueError("The binary graph file was written with another byte order!")
+    lengths = [n + 1, m, m, n + 1, m, m]
+    if not flags & IDENTITY_VERTICES:
+        lengths.insert(0, n)
+    if n < 0 or m < 0 or len(buffer) != BINARY_HEADER.size + 8 * sum(lengths):
+        raise ValueError("The binary graph file is truncated!")
+    words = memoryview(buffer)[BINARY_HEADER.size:].cast('q')
+    sections = []
+    position = 0
+    for length in lengths:
+        sections.append(words[position:position + length])
+        position += length
+    if flags & IDENTITY_VERTICES:
+        sections.insert(0, range(n))
+    _check_binary_graph_sections(n, m, *sections[1:])
+    return sections
+
+
+def parse_binary_graph_file(filename):
+    '''
+    Reads a graph file written in the binary format. The file is memory-mapped and checked by binary_graph_views, and
+only its outbound arrays are used. Returns the same (vertices, sources, targets, costs) tuple as parse_graph_file,
+with every edge x -> y of the file (for the undirected graphs of labs 2 and 4, it is the edge x - y).
+    '''
+    vertices, offsets, targets, costs = binary_graph_views(map_binary_graph_file(filename))[:4]
+    vertices = list(vertices)
+    sources = array('q', chain.from_iterable(map(repeat, vertices, map(sub, offsets[1:], offsets[:-1]))))
+    targets = array('q', map(vertices.__getitem__, targets))
+    return vertices, sources, targets, array('q', costs)
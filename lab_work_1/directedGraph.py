@@ -1,5 +1,15 @@
 import random
 import copy
+import os
+import sys
+from array import array
+
+# the graph files (the text formats and the binary graph format) are shared by all the labs
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_files import BINARY_MAGIC, BINARY_VERSION, BINARY_HEADER, IDENTITY_VERTICES, BIG_ENDIAN, \
+    binary_graph_views, is_binary_graph_file, map_binary_graph_file, parse_graph_file
+
 
 class DirectedGraph:
     '''
@@ -10,6 +20,9 @@ a list of OUTbound neighbours (the list will be empty if the vertex is isolated)
 list of INbound neighbours (the list will be empty if the vertex is isolated);
         > self._dictCOST = a dictionary in which every key, which is a tuple (x, y) corresponding to each edge of
 the graph, has as value the cost of that edge.
+    The "lists" of neighbours are in fact dictionaries whose keys are the neighbours (and whose values are None): they
+keep the insertion order, like a list, but checking if a vertex is a neighbour and removing a neighbour take O(1)
+time instead of O(degree).
     '''
     def __init__(self):
         '''
@@ -19,6 +32,8 @@ will be initialized in the function initialize_dict_key.
         self._dictIN = {}
         self._dictOUT = {}
         self._dictCOST = {}
+        # the last frozen (CSR) view of the graph; it is dropped whenever the graph is modified
+        self._frozen = None
 
     def get_dictOUT(self):
         # a getter for the dictionary of outbound neighbours
@@ -37,8 +52,9 @@ will be initialized in the function initialize_dict_key.
         Initialize the list of outbound/inbound neighbours of a given vertex. That given vertex is the key associated
 to that list.
         '''
-        self._dictIN[key] = []
-        self._dictOUT[key] = []
+        self._dictIN[key] = {}
+        self._dictOUT[key] = {}
+        self._frozen = None
 
     def is_vertex(self, x):
         # if x is a key in the dictionary of vertices and their successors, it is a vertex of the graph:
@@ -71,9 +87,31 @@ to that list.
             - add x in the list of the predecesors of y
             - add (x, y) in the dictionary of costs, together with the cost of the edge (as its corresponding value)
         '''
-        self._dictOUT[x].append(y)
-        self._dictIN[y].append(x)
+        self._dictOUT[x][y] = None
+        self._dictIN[y][x] = None
         self._dictCOST[(x, y)] = c
+        self._frozen = None
+
+    def add_edges(self, sources, targets, costs):
+        '''
+        Adds many edges at once: the i-th edge goes from sources[i] to targets[i] and has the cost costs[i]. The
+    edges are checked all together before any of them is added: every endpoint must be a vertex and no edge may
+    appear twice in the batch or be already in the graph (these checks are made with set operations, instead of
+    calling is_edge for every edge).
+        '''
+        edges = list(zip(sources, targets))
+        if not self._dictOUT.keys() >= set(sources) or not self._dictOUT.keys() >= set(targets):
+            raise ValueError("Invalid vertexes!")
+        new_costs = dict(zip(edges, costs))
+        if len(new_costs) != len(edges) or not new_costs.keys().isdisjoint(self._dictCOST.keys()):
+            raise ValueError("The edge already exists!")
+        dict_out = self._dictOUT
+        dict_in = self._dictIN
+        for x, y in edges:
+            dict_out[x][y] = None
+            dict_in[y][x] = None
+        self._dictCOST.update(new_costs)
+        self._frozen = None
 
     def nr_of_vertices(self):
         '''
@@ -147,9 +185,10 @@ the list of predecessors of x.
             - remove x from the list of predecessors of y
             - remove the pair (x, y) and its cost from the dictionary of costs
         '''
-        self._dictOUT[x].remove(y)
-        self._dictIN[y].remove(x)
+        del self._dictOUT[x][y]
+        del self._dictIN[y][x]
         del self._dictCOST[(x,y)]
+        self._frozen = None
 
     def add_vertex(self, x):
         '''
@@ -179,7 +218,7 @@ the list of predecessors of x.
         '''
         for y in self._dictOUT[x]:
             del self._dictCOST[(x,y)]
-            self._dictIN[y].remove(x)
+            del self._dictIN[y][x]
             '''
         As above, we delete the edges which have as end point the vertex x by parsing the list of predecessors of x
     and by deleting, for every predecessor of x, the edge (predecessor_of_x, x) from the dictionary of costs.
@@ -188,30 +227,33 @@ the list of predecessors of x.
             '''
         for y in self._dictIN[x]:
             del self._dictCOST[(y,x)]
-            self._dictOUT[y].remove(x)
+            del self._dictOUT[y][x]
         '''
         Finally, we remove the key x from the dictionaries of vertices and their successors/ predecessors.
         '''
         del self._dictIN[x]
         del self._dictOUT[x]
+        self._frozen = None
 
     def modify_vertex(self, x, y):
         if self.is_vertex(x) is False or self.is_vertex(y) is True:
             raise ValueError("Invalid vertices!")
         for z in self._dictOUT[x]:
             self._dictCOST[(y, z)] = self._dictCOST.pop((x, z))
-            self._dictIN[z].remove(x)
-            self._dictIN[z].append(y)
+            del self._dictIN[z][x]
+            self._dictIN[z][y] = None
         for z in self._dictIN[x]:
             self._dictCOST[(z, y)] = self._dictCOST.pop((z, x))
-            self._dictOUT[z].remove(x)
-            self._dictOUT[z].append(y)
+            del self._dictOUT[z][x]
+            self._dictOUT[z][y] = None
         self._dictIN[y] = self._dictIN.pop(x)
         self._dictOUT[y] = self._dictOUT.pop(x)
+        self._frozen = None
 
-    def modify_cost(x, y, newC):
+    def modify_cost(self, x, y, newC):
         if self.is_edge(x, y) is True:
             self._dictCOST[(x, y)] = newC
+            self._frozen = None
             return
         else:
             raise ValueError("NonExistent Edge!")
@@ -220,10 +262,186 @@ the list of predecessors of x.
         self._dictOUT = copy.deepcopy(graph.get_dictOUT())
         self._dictIN = copy.deepcopy(graph.get_dictIN())
         self._dictOUT = copy.deepcopy(graph.get_dictCOST())
+        self._frozen = None
+
+    def freeze(self, release=False):
+        '''
+        Returns an immutable compressed-sparse-row view of the graph (see FrozenDirectedGraph). The view is built
+    only once and it is reused until the graph is modified again, so the read-only algorithms can call freeze()
+    before every run.
+        The cached view is kept next to the three dictionaries, so it adds its (small) arrays to the memory of the
+    graph instead of replacing the dictionaries, and any modification, even of a single cost, drops it, so the next
+    freeze() costs O(n + m) again: a graph whose modifications and queries alternate is better served by the
+    dictionaries. With release=True, the dictionaries are dropped once the view is built and the graph is left empty,
+    so only the compact view stays in memory (FrozenDirectedGraph.thaw builds a DirectedGraph from it again).
+        '''
+        if self._frozen is None:
+            self._frozen = FrozenDirectedGraph.from_dicts(self._dictOUT, self._dictIN, self._dictCOST)
+        frozen = self._frozen
+        if release is True:
+            self._dictIN = {}
+            self._dictOUT = {}
+            self._dictCOST = {}
+            self._frozen = None
+        return frozen
 
     def __str__(self):
-        return str(self._dictOUT)
+        return str({x: list(self._dictOUT[x]) for x in self._dictOUT})
+
+
+
+class FrozenDirectedGraph:
+    '''
+    An immutable compressed-sparse-row (CSR) view of a DirectedGraph. Every vertex has an index from 0 to n-1 (its
+position in self._vertices) and the edges are stored in flat arrays of integers:
+        > self._out_offsets = an array of n+1 positions; the outbound neighbours of the vertex with the index i are
+self._out_targets[self._out_offsets[i]:self._out_offsets[i+1]] (as indices) and the costs of those edges are
+found at the same positions in self._out_costs;
+        > self._in_offsets, self._in_sources, self._in_costs = the same thing, for the inbound neighbours.
+    Compared to the dictionaries of lists and the dictionary of (x, y) tuples, an edge costs only a few machine words
+and the neighbours of a vertex are contiguous in memory.
+    The arrays can be any sequences of integers (array objects, or memoryviews over a memory-mapped file, see
+open_binary_graph). If the vertices are exactly 0, 1, ..., n-1, self._vertices is range(n) and a vertex is its own
+index; otherwise the dictionary from vertices to indices is built the first time it is needed.
+    '''
+    def __init__(self, vertices, out_offsets, out_targets, out_costs, in_offsets, in_sources, in_costs):
+        self._vertices = vertices
+        self._index = None
+        self._identity = isinstance(vertices, range) and vertices.start == 0 and vertices.step == 1
+        self._out_offsets = out_offsets
+        self._out_targets = out_targets
+        self._out_costs = out_costs
+        self._in_offsets = in_offsets
+        self._in_sources = in_sources
+        self._in_costs = in_costs
+
+    @staticmethod
+    def from_dicts(dict_out, dict_in, dict_cost):
+        '''
+        Builds the view from the three dictionaries of a DirectedGraph. The vertices keep the order of the keys
+    of dict_out and the neighbours of every vertex keep the order of its list.
+        '''
+        vertices = list(dict_out.keys())
+        index = {vertex: i for i, vertex in enumerate(vertices)}
+        if all(vertex == i for vertex, i in index.items()):
+            vertices = range(len(vertices))
+        out_offsets, out_targets, out_costs = array('q', [0]), array('q'), array('q')
+        in_offsets, in_sources, in_costs = array('q', [0]), array('q'), array('q')
+        for x in vertices:
+            out_targets.extend([index[y] for y in dict_out[x]])
+            out_costs.extend([dict_cost[(x, y)] for y in dict_out[x]])
+            out_offsets.append(len(out_targets))
+            in_sources.extend([index[y] for y in dict_in[x]])
+            in_costs.extend([dict_cost[(y, x)] for y in dict_in[x]])
+            in_offsets.append(len(in_sources))
+        return FrozenDirectedGraph(vertices, out_offsets, out_targets, out_costs, in_offsets, in_sources, in_costs)
+
+    def freeze(self):
+        # the view is already frozen
+        return self
+
+    def get_out_arrays(self):
+        # a getter for the (offsets, targets, costs) arrays of the outbound edges
+        return self._out_offsets, self._out_targets, self._out_costs
+
+    def get_in_arrays(self):
+        # a getter for the (offsets, sources, costs) arrays of the inbound edges
+        return self._in_offsets, self._in_sources, self._in_costs
+
+    def get_vertices(self):
+        # a getter for the sequence of vertices (the vertex with the index i is on the position i)
+        return self._vertices
+
+    def get_edge_list(self):
+        '''
+        Returns (vertices, sources, targets, costs), the same edge list as parse_graph_file: the i-th edge goes from
+    sources[i] to targets[i] and has the cost costs[i].
+        '''
+        vertices = list(self._vertices)
+        sources, targets = array('q'), array('q')
+        for i in range(len(vertices)):
+            degree = self._out_offsets[i + 1] - self._out_offsets[i]
+            sources.extend([vertices[i]] * degree)
+        targets.extend([vertices[j] for j in self._out_targets])
+        return vertices, sources, targets, array('q', self._out_costs)
+
+    def thaw(self):
+        # returns a new (modifiable) DirectedGraph with the vertices and the edges of the view
+        vertices, sources, targets, costs = self.get_edge_list()
+        graph = DirectedGraph()
+        for vertex in vertices:
+            graph.initialize_dict_key(vertex)
+        graph.add_edges(sources, targets, costs)
+        return graph
+
+    def index_of(self, x):
+        # returns the index of the vertex x, or None if x is not a vertex of the graph
+        if self._identity:
+            return x if x in self._vertices else None
+        if self._index is None:
+            self._index = {vertex: i for i, vertex in enumerate(self._vertices)}
+        return self._index.get(x)
+
+    def vertex_at(self, i):
+        # returns the vertex which has the index i
+        return self._vertices[i]
+
+    def is_vertex(self, x):
+        return self.index_of(x) is not None
+
+    def nr_of_vertices(self):
+        return len(self._vertices)
+
+    def nr_of_edges(self):
+        return len(self._out_targets)
+
+    def parse_vertices(self):
+        return list(self._vertices)
+
+    def is_edge(self, x, y):
+        i, j = self.index_of(x), self.index_of(y)
+        if i is None or j is None:
+            return False
+        for position in range(self._out_offsets[i], self._out_offsets[i + 1]):
+            if self._out_targets[position] == j:
+                return True
+        return False
+
+    def get_cost(self, x, y):
+        if self.is_vertex(x) is False or self.is_vertex(y) is False:
+            raise ValueError("Invalid vertices!")
+        i, j = self.index_of(x), self.index_of(y)
+        for position in range(self._out_offsets[i], self._out_offsets[i + 1]):
+            if self._out_targets[position] == j:
+                return self._out_costs[position]
+        raise ValueError("Non-existent edge!")
+
+    def get_the_outdegree(self, x):
+        if self.is_vertex(x) is False:
+            raise ValueError("This is not a vertex!")
+        i = self.index_of(x)
+        return self._out_offsets[i + 1] - self._out_offsets[i]
 
+    def get_the_indegree(self, x):
+        if self.is_vertex(x) is False:
+            raise ValueError("This is not a vertex!")
+        i = self.index_of(x)
+        return self._in_offsets[i + 1] - self._in_offsets[i]
+
+    def get_outbound_edges(self, x):
+        if self.is_vertex(x) is False:
+            raise ValueError("This is not a vertex!")
+        i = self.index_of(x)
+        return [self._vertices[j] for j in self._out_targets[self._out_offsets[i]:self._out_offsets[i + 1]]]
+
+    def get_inbound_edges(self, x):
+        if self.is_vertex(x) is False:
+            raise ValueError("This is not a vertex!")
+        i = self.index_of(x)
+        return [self._vertices[j] for j in self._in_sources[self._in_offsets[i]:self._in_offsets[i + 1]]]
+
+    def __str__(self):
+        return str({x: self.get_outbound_edges(x) for x in self._vertices})
 
 
 
@@ -382,46 +600,20 @@ all of the integer numbers in range (0, n).
 of the graph and their cost (the isolated vertices were stored with the format: the_isolated_vertex -1 0). In this
 case, the graph will have as vertices the integers which define the endpoints of the edges, plus the isolated
 vertices.
+    A file written by write_binary_graph is recognized by its header and its edges are copied into a new (mutable)
+graph.
     '''
-    f = open(filename)
-    graph = DirectedGraph()
-    # read the first line of the text file:
-    value = f.readline()
-    value = value[:-1].split(' ')
-    # if the text file contains on the first line 2 values (n and m), that means that the graph has as vertices
-# all of the numbers in range (0, n)
-    if len(value) == 2:
-        n = int(value[0])
-        m = int(value[1])
-        for i in range(n):
-            graph.initialize_dict_key(i)
-        for i in range(m):
-            value = f.readline()
-            value = value[:-1].split(' ')
-            graph.add_edge(int(value[0]), int(value[1]), int(value[2]))
+    if is_binary_graph_file(filename):
+        vertices, sources, targets, costs = open_binary_graph(filename).get_edge_list()
     else:
-        # else, the text file contains only the edges and their costs. The isolated vertices were stored with the 
-# format: the_isolated_vertex -1 0
-        while True:
-            try:
-                x = int(value[0])
-                y = int(value[1])
-                cost = int(value[2])
-                if graph.is_vertex(x) is False:
-                    graph.initialize_dict_key(x)
-                if y != -1 and graph.is_vertex(y) is False:
-                    graph.initialize_dict_key(y)
-                if y != -1:
-                    graph.add_edge(x, y, cost)
-                value = f.readline()
-                value = value[:-1].split(' ')
-                if len(value) != 3:
-                    break
-            except EOFError:
-                break
-    f.close()
+        vertices, sources, targets, costs = parse_graph_file(filename)
+    graph = DirectedGraph()
+    for vertex in vertices:
+        graph.initialize_dict_key(vertex)
+    graph.add_edges(sources, targets, costs)
     return graph
 
+
 def write_to_file(filename, graph):
     '''
     The function writes the graph in the file so that the file can be used further as an input file. In other words,
@@ -440,6 +632,53 @@ cost and the isolated vertices will be stored with the format: the_isolated_vert
                 value = str(x) + ' ' + str(y) + ' ' + str(dict_cost[(x, y)]) + '\n'
                 f.write(value)
 
+def write_binary_graph(filename, graph):
+    '''
+    Writes the graph in the binary format which can be opened by open_binary_graph:
+        - a header of 32 bytes: the magic string b'GRAPHCSR', the version of the format, the flags, n and m;
+        - the n vertices (only if they are not exactly 0, 1, ..., n-1);
+        - the arrays of the frozen view of the graph: the outbound offsets (n+1 values), targets (m values) and
+    costs (m values), then the inbound offsets (n+1 values), sources (m values) and costs (m values).
+    All the values after the header are 8-byte integers, in the byte order of the machine that writes the file.
+    '''
+    frozen = graph.freeze()
+    vertices = frozen.get_vertices()
+    out_arrays = frozen.get_out_arrays()
+    in_arrays = frozen.get_in_arrays()
+    flags = BIG_ENDIAN if sys.byteorder == 'big' else 0
+    sections = []
+    if isinstance(vertices, range) and vertices.start == 0 and vertices.step == 1:
+        flags |= IDENTITY_VERTICES
+    else:
+        sections.append(array('q', vertices))
+    sections.extend(out_arrays)
+    sections.extend(in_arrays)
+    with open(filename, 'wb') as f:
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, flags, frozen.nr_of_vertices(),
+                                   frozen.nr_of_edges()))
+        for section in sections:
+            f.write(section)
+
+
+def convert_to_binary(text_filename, binary_filename):
+    '''
+    Converts a graph file written in one of the two text formats accepted by read_graph_from_file into the binary
+format, so that the graph can then be opened instantly with open_binary_graph.
+    '''
+    write_binary_graph(binary_filename, read_graph_from_file(text_filename))
+
+
+def open_binary_graph(filename):
+    '''
+    Opens a file written by write_binary_graph without reading it: the file is memory-mapped (read only) and the
+arrays of the returned FrozenDirectedGraph are views over the mapped memory, so nothing is copied. Opening a file only
+checks the offsets and the neighbours (one pass over them, see binary_graph_views in graph_files.py), the costs are
+loaded only when an algorithm touches them and all the processes which open the same file share the same pages of the
+page cache.
+    '''
+    return FrozenDirectedGraph(*binary_graph_views(map_binary_graph_file(filename)))
+
+
 def initialize_random_graph():
     '''
     Reads the number of vertices (n) and the number of edges (m) of the randomly created graph.
@@ -474,5 +713,9 @@ this way will be added to the graph. The process stops when the number of edges
     return graph
 
 
-ui = UI()
-ui.run()
+if len(sys.argv) == 4 and sys.argv[1] == '--convert':
+    # python directedGraph.py --convert graph.txt graph.bin
+    convert_to_binary(sys.argv[2], sys.argv[3])
+else:
+    ui = UI()
+    ui.run()
@@ -1,9 +1,88 @@
+import glob
+import json
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+from array import array
+from collections import deque
+from itertools import chain, compress, repeat
+from multiprocessing import shared_memory
+from operator import gt, lt, ne
+
+# the graph files (the text formats and the binary graph format) are shared by all the labs
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_files import is_binary_graph_file, parse_binary_graph_file, parse_graph_file
+
+
+class UnionFind:
+    '''
+    The disjoint sets of the indices 0, 1, ..., n-1, which can grow one index at a time:
+        > self._parent[x] = the parent of x in the tree of its set (the root is its own parent);
+        > self._rank[r] = an upper bound of the height of the tree whose root is r.
+    find halves the paths (every element on the path is linked to its grandparent) and union links the root of
+smaller rank under the other one, so both take almost constant amortized time.
+    '''
+    def __init__(self):
+        self._parent = array('q')
+        self._rank = bytearray()
+        self._nr_of_sets = 0
+
+    def add(self):
+        # adds a new index, alone in its set, and returns it
+        self._parent.append(len(self._parent))
+        self._rank.append(0)
+        self._nr_of_sets += 1
+        return len(self._parent) - 1
+
+    def find(self, x):
+        parent = self._parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, x, y):
+        # joins the sets of x and y; returns False if they were already the same set
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        if self._rank[x] < self._rank[y]:
+            x, y = y, x
+        self._parent[y] = x
+        if self._rank[x] == self._rank[y]:
+            self._rank[x] += 1
+        self._nr_of_sets -= 1
+        return True
+
+    def nr_of_sets(self):
+        return self._nr_of_sets
+
+
 class UndirectedGraph:
+    '''
+    The graph is represented by a dictionary in which every key (every vertex of the graph) has as value the list of
+its neighbours. The connected components are also tracked while the graph is built: every vertex has an index in
+self._components (a UnionFind), given by self._index (self._vertex_of is the inverse list), and every new edge joins
+the sets of its endpoints, so the questions about components are answered without a search. A removed edge drops the
+UnionFind (self._components is None), which is rebuilt when it is needed again.
+    '''
     def __init__(self):
         self._dictNeighbours = {}
+        self._index = {}
+        self._vertex_of = []
+        self._components = UnionFind()
 
     def init_key(self, key):
         self._dictNeighbours[key] = []
+        if key not in self._index:
+            self._index[key] = len(self._vertex_of)
+            self._vertex_of.append(key)
+            if self._components is not None:
+                self._components.add()
 
     def is_vertex(self, x):
         return x in self._dictNeighbours.keys()
@@ -15,10 +94,66 @@ class UndirectedGraph:
         if self.is_edge(x, y) is False:
             self._dictNeighbours[x].append(y)
             self._dictNeighbours[y].append(x)
+            if self._components is not None:
+                self._components.union(self._index[x], self._index[y])
+
+    def remove_edge(self, x, y):
+        # the union-find cannot split a set, so it is dropped and rebuilt by the next question about the components
+        # (to answer them while edges are removed, use a DynamicConnectivity)
+        if self.is_vertex(x) is False or self.is_vertex(y) is False or self.is_edge(x, y) is False:
+            raise ValueError("This is not an edge!")
+        self._dictNeighbours[x].remove(y)
+        self._dictNeighbours[y].remove(x)
+        self._components = None
+
+    def add_edges(self, sources, targets):
+        '''
+        Adds many edges at once: the i-th edge is sources[i] - targets[i]. Like in add_edge, an edge which is already
+    in the graph (in any direction) is skipped, but the check is made against a set of all the edges, built once for
+    the whole batch, instead of searching the lists of neighbours for every edge.
+        '''
+        dict_neighbours = self._dictNeighbours
+        edges = set()
+        for x, neighbours in dict_neighbours.items():
+            edges.update((x, y) if x <= y else (y, x) for y in neighbours)
+        for x, y in zip(sources, targets):
+            edge = (x, y) if x <= y else (y, x)
+            if edge not in edges:
+                edges.add(edge)
+                dict_neighbours[x].append(y)
+                dict_neighbours[y].append(x)
+                if self._components is not None:
+                    self._components.union(self._index[x], self._index[y])
 
     def parse_adjacent_vertices(self, x):
         return self._dictNeighbours[x]
 
+    def _union_find(self):
+        if self._components is None:
+            components = UnionFind()
+            for _ in self._vertex_of:
+                components.add()
+            for x, neighbours in self._dictNeighbours.items():
+                for y in neighbours:
+                    components.union(self._index[x], self._index[y])
+            self._components = components
+        return self._components
+
+    def same_component(self, x, y):
+        if self.is_vertex(x) is False or self.is_vertex(y) is False:
+            raise ValueError("Invalid vertices!")
+        components = self._union_find()
+        return components.find(self._index[x]) == components.find(self._index[y])
+
+    def component_of(self, x):
+        # returns a representative of the component of x: the same vertex for all the vertices of a component
+        if self.is_vertex(x) is False:
+            raise ValueError("This is not a vertex!")
+        return self._vertex_of[self._union_find().find(self._index[x])]
+
+    def nr_of_components(self):
+        return self._union_find().nr_of_sets()
+
     def get_all_vertices(self):
         return self._dictNeighbours.keys()
 
@@ -37,73 +172,755 @@ class UndirectedGraph:
 
 
 def read_graph_from_file(filename):
-    f = open(filename)
-    graph = UndirectedGraph()
-    value = f.readline()
-    value = value[:-1].split(' ')
-    # if the text file contains on the first line 2 values (n and m), that means that the graph has as vertices
-    # all of the numbers in range (0, n)
-    if len(value) == 2:
-        n = int(value[0])
-        m = int(value[1])
-        for i in range(n):
-            graph.init_key(i)
-        for i in range(m):
-            value = f.readline()
-            value = value[:-1].split(' ')
-            graph.add_edge(int(value[0]), int(value[1]))
+    if is_binary_graph_file(filename):
+        vertices, sources, targets, costs = parse_binary_graph_file(filename)
     else:
-        # else, the text file contains only the edges and their costs. The isolated vertices were stored with the
-        # format: the_isolated_vertex -1 0
-        while True:
-            try:
-                x = int(value[0])
-                y = int(value[1])
-                cost = int(value[2])
-                if graph.is_vertex(x) is False:
-                    graph.init_key(x)
-                if y != -1 and graph.is_vertex(y) is False:
-                    graph.init_key(y)
-                if y != -1:
-                    graph.add_edge(x, y)
-                value = f.readline()
-                value = value[:-1].split(' ')
-                if len(value) != 3:
-                    break
-            except EOFError:
-                break
-    f.close()
+        vertices, sources, targets, costs = parse_graph_file(filename)
+    graph = UndirectedGraph()
+    for vertex in vertices:
+        graph.init_key(vertex)
+    graph.add_edges(sources, targets)
     return graph
 
 
 def DFS(graph, start_vertex, visited):
+    '''
+    Builds the connected component of start_vertex as an UndirectedGraph, with an iterative depth-first search. The
+vertices which have been popped from the stack are kept in a set (and not in a list), and an edge node - adj_node is
+added when the first of its two endpoints is popped, directly in the lists of neighbours, so that the component is
+built in O(its number of vertices and edges), without calling is_edge.
+    '''
     visited.add(start_vertex)
-    accessible = []
+    accessible = set()
     stack = [start_vertex]
     component_as_graph = UndirectedGraph()
     component_as_graph.init_key(start_vertex)
+    component_neighbours = component_as_graph._dictNeighbours
     while stack:
         node = stack.pop()
         if node not in accessible:
-            accessible.append(node)
+            accessible.add(node)
             for adj_node in graph.parse_adjacent_vertices(node):
                 if adj_node not in visited:
                     component_as_graph.init_key(adj_node)
                     visited.add(adj_node)
                     stack.append(adj_node)
-                component_as_graph.add_edge(node, adj_node)
+                if adj_node not in accessible:
+                    component_neighbours[node].append(adj_node)
+                    component_neighbours[adj_node].append(node)
+                elif adj_node == node and node not in component_neighbours[node]:
+                    # a loop is added once, like add_edge does
+                    component_neighbours[node].append(node)
+                    component_neighbours[node].append(node)
+    # the edges were added without add_edge, so the UnionFind of the component did not see them: it is dropped and
+    # rebuilt by the first question about the components
+    component_as_graph._components = None
     return component_as_graph
 
 
-def connected_components(graph):
-    visited = set()
-    counter = 1
-    for vertex in graph.get_all_vertices():
-        if vertex not in visited:
-            print("Component nr. " + str(counter))
-            component_as_graph = DFS(graph, vertex, visited)
-            print(component_as_graph)
-            counter += 1
+class Components:
+    '''
+    The connected components of a graph, as an array of labels:
+        > self._vertices = the list of the vertices of the graph (the vertex with the index i is on the position i);
+        > self._labels[i] = the label of the component of the vertex with the index i; the components are labelled
+0, 1, 2, ... in the order of their first vertex;
+        > self._sizes[c] = the number of vertices of the component with the label c;
+        > self._first[c] = the index of the first vertex of the component with the label c.
+    The labels are computed in O(n + m) by compute_components. A component is built as an UndirectedGraph (by DFS)
+only when it is asked for, by component_as_graph.
+    '''
+    def __init__(self, graph, vertices, labels, sizes, first):
+        self._graph = graph
+        self._vertices = vertices
+        self._index = None
+        self._labels = labels
+        self._sizes = sizes
+        self._first = first
+
+    def nr_of_components(self):
+        return len(self._sizes)
+
+    def get_vertices(self):
+        return self._vertices
+
+    def get_labels(self):
+        return self._labels
+
+    def get_sizes(self):
+        return self._sizes
+
+    def label_of(self, x):
+        if self._index is None:
+            self._index = {vertex: i for i, vertex in enumerate(self._vertices)}
+        if x not in self._index:
+            raise ValueError("This is not a vertex!")
+        return self._labels[self._index[x]]
+
+    def get_component_vertices(self, label):
+        return [self._vertices[i] for i in range(len(self._vertices)) if self._labels[i] == label]
+
+    def component_as_graph(self, label):
+        if self._graph is None:
+            raise ValueError("The components were found without building the graph!")
+        return DFS(self._graph, self._vertices[self._first[label]], set())
+
+
+def compute_components(graph):
+    '''
+    Labels the connected components of the graph with an iterative depth-first search, in O(n + m): a vertex gets its
+label when it is pushed on the stack, so it is pushed only once, and the labels are kept in an array indexed by the
+position of the vertex in get_all_vertices. Returns a Components object.
+    '''
+    vertices = list(graph.get_all_vertices())
+    index = {vertex: i for i, vertex in enumerate(vertices)}
+    labels = array('q', [-1]) * len(vertices)
+    sizes = array('q')
+    first = array('q')
+    for i in range(len(vertices)):
+        if labels[i] != -1:
+            continue
+        label = len(sizes)
+        labels[i] = label
+        first.append(i)
+        size = 1
+        stack = [i]
+        while stack:
+            x = stack.pop()
+            for y in graph.parse_adjacent_vertices(vertices[x]):
+                j = index[y]
+                if labels[j] == -1:
+                    labels[j] = label
+                    size += 1
+                    stack.append(j)
+        sizes.append(size)
+    return Components(graph, vertices, labels, sizes, first)
+
+
+LABEL_PROPAGATION_PARALLEL_EDGES = 1 << 16    # the smallest number of edges of a round which is split between processes
+
+
+def _hooks(sources, targets, labels, begin, end):
+    '''
+    A round of propagate_labels over the edges on the positions begin, ..., end-1 of the arrays: the edges whose
+endpoints already have the same label are dropped and the others are moved to the beginning of the chunk. Returns
+(the number of kept edges, greater, smaller): the two labels of every kept edge, in two arrays. Every step is made over
+a whole array, by map and compress, so no Python code runs for an edge.
+    '''
+    first = array('q', map(labels.__getitem__, sources[begin:end]))
+    second = array('q', map(labels.__getitem__, targets[begin:end]))
+    kept = bytes(map(ne, first, second))
+    first_greater = bytes(map(gt, first, second))
+    second_greater = bytes(map(lt, first, second))
+    kept_sources = array('q', compress(sources[begin:end], kept))
+    sources[begin:begin + len(kept_sources)] = kept_sources
+    targets[begin:begin + len(kept_sources)] = array('q', compress(targets[begin:end], kept))
+    greater = array('q', compress(first, first_greater)) + array('q', compress(second, second_greater))
+    smaller = array('q', compress(second, first_greater)) + array('q', compress(first, second_greater))
+    return len(kept_sources), greater, smaller
+
+
+# the state of a worker process of propagate_labels, set by _attach_label_arrays: (the shared block, the views of
+# the sources, targets and labels arrays over it)
+_shared_labels = None
+
+
+def _attach_label_arrays(name, m, n):
+    # the initializer of the worker processes: the arrays of the edges and of the labels are viewed in the shared block
+    global _shared_labels
+    memory = shared_memory.SharedMemory(name=name)
+    words = memory.buf.cast('q')
+    _shared_labels = (memory, words[:m], words[m:2 * m], words[2 * m:2 * m + n])
+
+
+def _shared_hooks(chunk):
+    # the task of a worker process: a round of propagate_labels over a chunk of positions of the edges
+    memory, sources, targets, labels = _shared_labels
+    return _hooks(sources, targets, labels, *chunk)
+
+
+def propagate_labels(n, sources, targets, processes=1):
+    '''
+    Finds the connected components of a graph given as flat arrays: its vertices are 0, 1, ..., n-1 and its edges are
+sources[i] - targets[i]. Returns an array in which the value of every vertex is the smallest vertex of its component.
+    Every round (Shiloach-Vishkin style) drops the edges whose endpoints have the same label, hooks the greater label
+of every other edge under the smaller one and then jumps the pointers (labels[x] = labels[labels[x]]) until every label
+is the root of its tree again. A label never grows and the root of a tree is its smallest vertex, so every component
+ends up labelled with its smallest vertex. All the steps work on whole arrays (see _hooks), and when there are many
+edges they are split in chunks between the worker processes, which share the arrays in a block of shared memory.
+    Without vectorized kernels, a round still costs a few calls in C for every edge, so on a graph which is already
+built this is slower than compute_components; it pays off for the files of components_from_file, where no
+UndirectedGraph has to be built, and with many worker processes. It does not reach components in seconds for 100M
+edges: one core handles about 200K edges per second (a graph with a million edges takes about 5 seconds), so 100M
+edges take minutes, divided by the number of cores. That would need numpy-like kernels, which this lab does not use.
+    '''
+    m = len(sources)
+    labels = array('q', range(n))
+    memory = pool = None
+    if processes > 1 and m >= LABEL_PROPAGATION_PARALLEL_EDGES:
+        memory = shared_memory.SharedMemory(create=True, size=max(1, 8 * (2 * m + n)))
+        words = memory.buf.cast('q')
+        shared_sources, shared_targets, shared_labels = words[:m], words[m:2 * m], words[2 * m:2 * m + n]
+        shared_sources[:] = array('q', sources)
+        shared_targets[:] = array('q', targets)
+        pool = multiprocessing.Pool(processes, _attach_label_arrays, (memory.name, m, n))
+        chunk_size = -(-m // processes)
+        chunks = [(i, min(i + chunk_size, m)) for i in range(0, m, chunk_size)]
+    else:
+        sources, targets = array('q', sources), array('q', targets)
+    try:
+        while True:
+            if pool is not None and sum(end - begin for begin, end in chunks) >= LABEL_PROPAGATION_PARALLEL_EDGES:
+                shared_labels[:] = labels
+                results = pool.map(_shared_hooks, chunks)
+                chunks = [(begin, begin + result[0]) for (begin, end), result in zip(chunks, results) if result[0] > 0]
+                greater, smaller = array('q'), array('q')
+                for kept, chunk_greater, chunk_smaller in results:
+                    greater.extend(chunk_greater)
+                    smaller.extend(chunk_smaller)
+            else:
+                if pool is not None:
+                    # the remaining edges are gathered out of the shared block, and the rounds go on in this process
+                    sources = array('q', chain.from_iterable(shared_sources[begin:end] for begin, end in chunks))
+                    targets = array('q', chain.from_iterable(shared_targets[begin:end] for begin, end in chunks))
+                    pool.close()
+                    pool.join()
+                    pool = None
+                kept, greater, smaller = _hooks(sources, targets, labels, 0, len(sources))
+                del sources[kept:], targets[kept:]
+            if not greater:
+                return labels
+            # the maps are lazy, so every label is read after the writes of the edges before it: a label is hooked
+            # under the smallest of its labels
+            deque(map(labels.__setitem__, greater, map(min, map(labels.__getitem__, greater), smaller)), maxlen=0)
+            # the same for the jumps: labels[x] <= x, so labels[labels[x]] has already jumped to the root of the tree
+            # of x when x is reached, and a single pass over the array is enough
+            deque(map(labels.__setitem__, range(n), map(labels.__getitem__, labels)), maxlen=0)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if memory is not None:
+            del shared_sources, shared_targets, shared_labels, words
+            memory.close()
+            memory.unlink()
+
+
+def _components_from_roots(graph, vertices, roots):
+    # the Components of compute_components, from the result of propagate_labels: the root of a component is its
+    # first vertex, so the components are numbered in the order of their roots
+    labels = array('q', [-1]) * len(vertices)
+    sizes = array('q')
+    first = array('q')
+    for i, root in enumerate(roots):
+        if root == i:
+            labels[i] = len(sizes)
+            sizes.append(0)
+            first.append(i)
+        else:
+            labels[i] = labels[root]
+        sizes[labels[i]] += 1
+    return Components(graph, vertices, labels, sizes, first)
+
+
+def label_propagation_components(graph, processes=1):
+    '''
+    Labels the connected components of the graph like compute_components (the same Components, with the same
+labels), but with propagate_labels over flat arrays of the edges (every edge is taken once, from its endpoint with the
+smaller position in get_all_vertices) instead of a depth-first search. It is slower than compute_components on a single
+process (see propagate_labels), so it is not the default mode of connected_components.
+    '''
+    vertices = list(graph.get_all_vertices())
+    index = {vertex: i for i, vertex in enumerate(vertices)}
+    neighbours = list(map(graph.parse_adjacent_vertices, vertices))
+    sources = array('q', chain.from_iterable(map(repeat, range(len(vertices)), map(len, neighbours))))
+    targets = array('q', map(index.__getitem__, chain.from_iterable(neighbours)))
+    once = bytes(map(lt, sources, targets))
+    sources, targets = array('q', compress(sources, once)), array('q', compress(targets, once))
+    return _components_from_roots(graph, vertices, propagate_labels(len(vertices), sources, targets, processes))
+
+
+def components_from_file(filename, processes=1):
+    '''
+    Labels the connected components of the graph of a file (in any format of read_graph_from_file) with
+propagate_labels, straight from the arrays of the parsed file, without building an UndirectedGraph, which is the
+slowest part for a big file. The labels are the ones of compute_components(read_graph_from_file(filename)), but the
+Components cannot build the components as graphs.
+    '''
+    parse = parse_binary_graph_file if is_binary_graph_file(filename) else parse_graph_file
+    vertices, sources, targets = parse(filename)[:3]
+    vertices = list(dict.fromkeys(vertices))
+    if vertices != list(range(len(vertices))):
+        index = {vertex: i for i, vertex in enumerate(vertices)}
+        sources = array('q', map(index.__getitem__, sources))
+        targets = array('q', map(index.__getitem__, targets))
+    return _components_from_roots(None, vertices, propagate_labels(len(vertices), sources, targets, processes))
+
+
+# the ways in which connected_components finds the components, by name
+COMPONENT_MODES = {'dfs': compute_components, 'propagation': label_propagation_components}
+
+
+def connected_components(graph, mode='dfs'):
+    if mode not in COMPONENT_MODES:
+        raise ValueError("Unknown mode: " + str(mode))
+    components = COMPONENT_MODES[mode](graph)
+    for label in range(components.nr_of_components()):
+        print("Component nr. " + str(label + 1))
+        print(components.component_as_graph(label))
+
+
+class EulerTourTrees:
+    '''
+    A forest of treaps which keep Euler tours of trees: a node is either a vertex or an arc of a tree edge (an edge
+u - v has the two arcs (u, v) and (v, u)), and a tree is kept as the sequence of the nodes of its tour, which starts
+with the vertex node of its root. The node 0 is the empty treap. For every node x:
+        > self._item[x] = the vertex, or the arc (u, v), of x;
+        > self._left[x], self._right[x], self._parent[x] = the children and the parent of x in its treap (0 if missing);
+        > self._count[x] = the number of nodes in the subtree of x, which gives the positions in the tour;
+        > self._size[x] = the number of vertex nodes in the subtree of x;
+        > self._mark[x] = the marks (bits) of x and self._marks[x] = the union of the marks of its subtree, so that a
+marked node of a tree is found by descending from the root of its treap.
+    All the operations take O(log n) expected time.
+    '''
+    def __init__(self):
+        self._item = [None]
+        self._left = [0]
+        self._right = [0]
+        self._parent = [0]
+        self._priority = [0.0]
+        self._count = [0]
+        self._size = [0]
+        self._mark = [0]
+        self._marks = [0]
+        self._free = []
+
+    def new_node(self, item, is_vertex):
+        # returns a new node, alone in its tour
+        if self._free:
+            x = self._free.pop()
+            self._item[x] = item
+            self._left[x] = self._right[x] = self._parent[x] = 0
+            self._priority[x] = random.random()
+            self._mark[x] = self._marks[x] = 0
+        else:
+            x = len(self._item)
+            self._item.append(item)
+            self._left.append(0)
+            self._right.append(0)
+            self._parent.append(0)
+            self._priority.append(random.random())
+            self._count.append(0)
+            self._size.append(0)
+            self._mark.append(0)
+            self._marks.append(0)
+        self._count[x] = 1
+        self._size[x] = 1 if is_vertex else 0
+        return x
+
+    def delete_node(self, x):
+        # x must be alone in its tour
+        self._item[x] = None
+        self._free.append(x)
+
+    def get_item(self, x):
+        return self._item[x]
+
+    def _update(self, x):
+        left, right = self._left[x], self._right[x]
+        self._count[x] = self._count[left] + 1 + self._count[right]
+        self._size[x] = self._size[left] + (0 if isinstance(self._item[x], tuple) else 1) + self._size[right]
+        self._marks[x] = self._marks[left] | self._mark[x] | self._marks[right]
+
+    def _merge(self, a, b):
+        # the tour a followed by the tour b; returns the root of the new treap
+        if a == 0 or b == 0:
+            return a or b
+        if self._priority[a] > self._priority[b]:
+            right = self._merge(self._right[a], b)
+            self._right[a] = right
+            self._parent[right] = a
+            self._update(a)
+            return a
+        left = self._merge(a, self._left[b])
+        self._left[b] = left
+        self._parent[left] = b
+        self._update(b)
+        return b
+
+    def _split(self, t, k):
+        # splits the tour of the treap t into its first k nodes and the rest; returns the roots of the two parts
+        if t == 0:
+            return 0, 0
+        left = self._left[t]
+        if self._count[left] >= k:
+            a, b = self._split(left, k)
+            self._left[t] = b
+            self._parent[b] = t
+            self._parent[a] = 0
+            self._update(t)
+            return a, t
+        a, b = self._split(self._right[t], k - self._count[left] - 1)
+        self._right[t] = a
+        self._parent[a] = t
+        self._parent[b] = 0
+        self._update(t)
+        return t, b
+
+    def _join(self, *treaps):
+        root = 0
+        for t in treaps:
+            root = self._merge(root, t)
+        self._parent[root] = 0
+        self._parent[0] = 0
+        return root
+
+    def root(self, x):
+        parent = self._parent
+        while parent[x]:
+            x = parent[x]
+        return x
+
+    def _position(self, x):
+        # returns the position of x in its tour and the root of its treap
+        position = self._count[self._left[x]]
+        while self._parent[x]:
+            parent = self._parent[x]
+            if self._right[parent] == x:
+                position += self._count[self._left[parent]] + 1
+            x = parent
+        return position, x
+
+    def size(self, x):
+        # the number of vertices in the tree of x
+        return self._size[self.root(x)]
+
+    def _reroot(self, x):
+        # rotates the tour of the vertex node x, so that it starts with x
+        position, root = self._position(x)
+        a, b = self._split(root, position)
+        return self._join(b, a)
+
+    def link(self, x, y, xy, yx):
+        # joins the trees of the vertex nodes x and y (which must be different) by the edge with the arcs xy and yx
+        self._join(self._reroot(x), xy, self._reroot(y), yx)
+
+    def cut(self, xy, yx):
+        # removes the edge with the arcs xy and yx: the tour A xy B yx C becomes the tours B and A C
+        first, root = self._position(xy)
+        second = self._position(yx)[0]
+        if first > second:
+            first, second = second, first
+        a, rest = self._split(root, first)
+        arc, rest = self._split(rest, 1)
+        b, rest = self._split(rest, second - first - 1)
+        arc, c = self._split(rest, 1)
+        self._parent[b] = 0
+        self._join(a, c)
+
+    def set_mark(self, x, mark, value):
+        if value:
+            self._mark[x] |= mark
+        else:
+            self._mark[x] &= ~mark
+        while x:
+            marks = self._marks[x]
+            self._update(x)
+            if self._marks[x] == marks:
+                break
+            x = self._parent[x]
+
+    def has_mark(self, root, mark):
+        return bool(self._marks[root] & mark)
+
+    def find_mark(self, root, mark):
+        # returns a node with the mark in the treap with the given root (which must have one)
+        x = root
+        while not self._mark[x] & mark:
+            x = self._left[x] if self._marks[self._left[x]] & mark else self._right[x]
+        return x
+
+
+TREE_EDGE_MARK = 1        # on the arc (u, v), u < v, of a tree edge, in the forest of the level of the edge
+NON_TREE_EDGES_MARK = 2   # on a vertex which has non-tree edges with the level of the forest
+
+
+class DynamicConnectivity:
+    '''
+    Fully dynamic connectivity for an UndirectedGraph (Holm, de Lichtenberg and Thorup): edges can be added and
+removed, a question about the components takes O(log n) time and an update takes O(log^2 n) amortized time.
+    Every edge has a level, at most log2(n). The forest F[i] holds the tree edges with the level >= i, so F[0] is a
+spanning forest of the graph, and a tree of F[i] has at most n / 2^i vertices. The trees of every F[i] are kept as
+Euler tours (in self._tours), the vertices are numbered in self._index and:
+        > self._loops[i][u] = the vertex node of u in F[i] (made when it is first needed);
+        > self._arcs[i][(u, v)] = the node of the arc (u, v) of a tree edge in F[i];
+        > self._non_tree[i][u] = the set of the vertices v such that u - v is a non-tree edge with the level i;
+        > self._level[(u, v)] = (the level of the edge u - v, u <= v, True if it is a tree edge).
+    When a tree edge with the level l is removed, a replacement is searched from the level l down to 0, in the
+smaller of the two trees of F[i]: its tree edges with the level i, and the non-tree edges with the level i which do
+not reconnect the two trees, are raised to the level i + 1, which pays for the search.
+    The graph must be modified only through this object (add_vertex, add_edge, remove_edge).
+    '''
+    def __init__(self, graph):
+        self._graph = graph
+        self._tours = EulerTourTrees()
+        self._index = {}
+        self._loops = [{}]
+        self._arcs = [{}]
+        self._non_tree = [{}]
+        self._level = {}
+        self._nr_of_components = 0
+        for vertex in graph.get_all_vertices():
+            self._index[vertex] = len(self._index)
+            self._nr_of_components += 1
+        for x in graph.get_all_vertices():
+            for y in graph.parse_adjacent_vertices(x):
+                self._insert(self._index[x], self._index[y])
+
+    def _loop(self, level, u):
+        node = self._loops[level].get(u)
+        if node is None:
+            node = self._tours.new_node(u, True)
+            self._loops[level][u] = node
+        return node
+
+    def _root(self, level, u):
+        return self._tours.root(self._loop(level, u))
+
+    def _link(self, level, u, v):
+        arcs = self._arcs[level]
+        arcs[(u, v)] = self._tours.new_node((u, v), False)
+        arcs[(v, u)] = self._tours.new_node((v, u), False)
+        self._tours.link(self._loop(level, u), self._loop(level, v), arcs[(u, v)], arcs[(v, u)])
+
+    def _cut(self, level, u, v):
+        xy, yx = self._arcs[level].pop((u, v)), self._arcs[level].pop((v, u))
+        self._tours.cut(xy, yx)
+        self._tours.delete_node(xy)
+        self._tours.delete_node(yx)
+
+    def _add_level(self):
+        self._loops.append({})
+        self._arcs.append({})
+        self._non_tree.append({})
+
+    def _add_tree_edge(self, u, v, level):
+        # u < v
+        for i in range(level + 1):
+            self._link(i, u, v)
+        self._tours.set_mark(self._arcs[level][(u, v)], TREE_EDGE_MARK, True)
+        self._level[(u, v)] = (level, True)
+
+    def _raise_tree_edge(self, u, v, level):
+        # the tree edge u - v, u < v, goes from the level to the level + 1
+        self._tours.set_mark(self._arcs[level][(u, v)], TREE_EDGE_MARK, False)
+        self._link(level + 1, u, v)
+        self._tours.set_mark(self._arcs[level + 1][(u, v)], TREE_EDGE_MARK, True)
+        self._level[(u, v)] = (level + 1, True)
+
+    def _add_non_tree_edge(self, u, v, level):
+        for x, y in ((u, v), (v, u)):
+            self._non_tree[level].setdefault(x, set()).add(y)
+            self._tours.set_mark(self._loop(level, x), NON_TREE_EDGES_MARK, True)
+        self._level[(u, v) if u <= v else (v, u)] = (level, False)
+
+    def _remove_non_tree_edge(self, u, v, level):
+        for x, y in ((u, v), (v, u)):
+            neighbours = self._non_tree[level][x]
+            neighbours.discard(y)
+            if not neighbours:
+                del self._non_tree[level][x]
+                self._tours.set_mark(self._loops[level][x], NON_TREE_EDGES_MARK, False)
+        del self._level[(u, v) if u <= v else (v, u)]
+
+    def _insert(self, u, v):
+        if u > v:
+            u, v = v, u
+        if u == v or (u, v) in self._level:
+            return
+        if self._root(0, u) == self._root(0, v):
+            self._add_non_tree_edge(u, v, 0)
+        else:
+            self._add_tree_edge(u, v, 0)
+            self._nr_of_components -= 1
+
+    def _delete(self, u, v):
+        if u > v:
+            u, v = v, u
+        if u == v:
+            return
+        level, is_tree_edge = self._level[(u, v)]
+        if is_tree_edge is False:
+            self._remove_non_tree_edge(u, v, level)
+            return
+        del self._level[(u, v)]
+        for i in range(level + 1):
+            self._cut(i, u, v)
+        tours = self._tours
+        for i in range(level, -1, -1):
+            root_u, root_v = self._root(i, u), self._root(i, v)
+            root = root_u if tours.size(root_u) <= tours.size(root_v) else root_v
+            if i + 1 == len(self._loops):
+                self._add_level()
+            while tours.has_mark(root, TREE_EDGE_MARK):
+                x, y = tours.get_item(tours.find_mark(root, TREE_EDGE_MARK))
+                self._raise_tree_edge(x, y, i)
+            while tours.has_mark(root, NON_TREE_EDGES_MARK):
+                x = tours.get_item(tours.find_mark(root, NON_TREE_EDGES_MARK))
+                for y in list(self._non_tree[i][x]):
+                    self._remove_non_tree_edge(x, y, i)
+                    if self._root(i, y) == root:
+                        self._add_non_tree_edge(x, y, i + 1)
+                    else:
+                        self._add_tree_edge(min(x, y), max(x, y), i)
+                        return
+        self._nr_of_components += 1
+
+    def add_vertex(self, x):
+        if self._graph.is_vertex(x):
+            raise ValueError("This vertex already exists!")
+        self._graph.init_key(x)
+        self._index[x] = len(self._index)
+        self._nr_of_components += 1
+
+    def add_edge(self, x, y):
+        if self._graph.is_vertex(x) is False or self._graph.is_vertex(y) is False:
+            raise ValueError("Invalid vertices!")
+        if self._graph.is_edge(x, y) is False:
+            self._graph.add_edge(x, y)
+            self._insert(self._index[x], self._index[y])
+
+    def remove_edge(self, x, y):
+        self._graph.remove_edge(x, y)
+        self._delete(self._index[x], self._index[y])
+
+    def connected(self, x, y):
+        if self._graph.is_vertex(x) is False or self._graph.is_vertex(y) is False:
+            raise ValueError("Invalid vertices!")
+        return self._root(0, self._index[x]) == self._root(0, self._index[y])
+
+    def nr_of_components(self):
+        return self._nr_of_components
+
+    def compute_components(self):
+        '''
+        Returns the components as a Components object, with the same labels as compute_components(graph): they are
+    numbered in the order of their first vertex in get_all_vertices, but the trees of F[0] are used instead of a
+    search, in O(n log n).
+        '''
+        vertices = list(self._graph.get_all_vertices())
+        labels = array('q', [-1]) * len(vertices)
+        sizes = array('q')
+        first = array('q')
+        label_of_tree = {}
+        for i, vertex in enumerate(vertices):
+            root = self._root(0, self._index[vertex])
+            if root not in label_of_tree:
+                label_of_tree[root] = len(sizes)
+                sizes.append(0)
+                first.append(i)
+            labels[i] = label_of_tree[root]
+            sizes[labels[i]] += 1
+        return Components(self._graph, vertices, labels, sizes, first)
+
+
+def benchmark_dynamic_connectivity(graph, nr_of_removals=100):
+    '''
+    Removes nr_of_removals random edges of the graph (which is modified), one at a time, and after every removal
+finds the number of components twice: with a DynamicConnectivity and with a new search (compute_components). Checks
+that both give the same partition and returns (the time of the DynamicConnectivity, the time of the searches), in
+seconds; the time to build the DynamicConnectivity is not included.
+    '''
+    edges = [(x, y) for x in graph.get_all_vertices() for y in graph.parse_adjacent_vertices(x) if x <= y]
+    edges = random.sample(edges, min(nr_of_removals, len(edges)))
+    dynamic = DynamicConnectivity(graph)
+    dynamic_time = search_time = 0.0
+    for x, y in edges:
+        start = time.perf_counter()
+        dynamic.remove_edge(x, y)
+        nr_of_components = dynamic.nr_of_components()
+        dynamic_time += time.perf_counter() - start
+        start = time.perf_counter()
+        components = compute_components(graph)
+        search_time += time.perf_counter() - start
+        if components.nr_of_components() != nr_of_components:
+            raise ValueError("The dynamic connectivity does not agree with the search!")
+    if list(dynamic.compute_components().get_labels()) != list(compute_components(graph).get_labels()):
+        raise ValueError("The dynamic connectivity does not agree with the search!")
+    return dynamic_time, search_time
+
+
+def batch_files(pattern):
+    # the files of a batch: all the files of a directory, or the files which match a glob pattern, sorted by name
+    if os.path.isdir(pattern):
+        names = (os.path.join(pattern, name) for name in os.listdir(pattern))
+    else:
+        names = glob.glob(pattern)
+    return sorted(name for name in names if os.path.isfile(name))
+
+
+def _component_summary(filename, mode):
+    # the task of a worker process of run_batch: reads a graph file and finds its components
+    started = time.perf_counter()
+    graph = read_graph_from_file(filename)
+    components = COMPONENT_MODES[mode](graph)
+    return {'file': filename, 'vertices': len(components.get_vertices()),
+            'edges': sum(len(graph.parse_adjacent_vertices(x)) for x in graph.get_all_vertices()) // 2,
+            'components': components.nr_of_components(), 'sizes': components.get_sizes().tolist(),
+            'seconds': round(time.perf_counter() - started, 6)}
+
+
+def run_batch(pattern, processes=None, in_flight=None, mode='dfs', output=sys.stdout):
+    '''
+    Finds the connected components of every file of a batch (see batch_files) without asking anything: the files are
+read and their components are found in a pool of worker processes (by default, one for every CPU). At most
+in_flight files (by default, 4 for every worker) are given to the pool at a time, so a batch of any size takes little
+memory. A JSON line is written to output for every file, as soon as it is done (so in the order of completion, not of
+the names): its numbers of vertices, edges and components and the sizes of the components, or the error for a file
+which could not be read. The last line is a summary of the batch, with its throughput, which is also returned.
+    '''
+    if mode not in COMPONENT_MODES:
+        raise ValueError("Unknown mode: " + str(mode))
+    files = batch_files(pattern)
+    processes = processes or os.cpu_count() or 1
+    in_flight = in_flight or 4 * processes
+    started = time.perf_counter()
+    done = queue.Queue()
+    summary = {'files': 0, 'failed': 0, 'vertices': 0, 'edges': 0}
+
+    def write(result):
+        summary['files'] += 1
+        if 'error' in result:
+            summary['failed'] += 1
+        else:
+            summary['vertices'] += result['vertices']
+            summary['edges'] += result['edges']
+        output.write(json.dumps(result) + '\n')
+        output.flush()
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        pending = 0
+        for filename in files:
+            if pending == in_flight:
+                write(done.get())
+                pending -= 1
+            pool.apply_async(_component_summary, (filename, mode), callback=done.put,
+                             error_callback=lambda error, filename=filename: done.put({'file': filename,
+                                                                                      'error': str(error)}))
+            pending += 1
+        while pending > 0:
+            write(done.get())
+            pending -= 1
+    finally:
+        pool.close()
+        pool.join()
+    seconds = time.perf_counter() - started
+    summary['seconds'] = round(seconds, 6)
+    summary['files_per_second'] = round(summary['files'] / max(seconds, 1e-9), 3)
+    summary['edges_per_second'] = round(summary['edges'] / max(seconds, 1e-9), 3)
+    output.write(json.dumps({'summary': summary}) + '\n')
+    output.flush()
+    return summary
 
 
 def run_lab_2():
@@ -115,5 +932,11 @@ def run_lab_2():
         connected_components(graph)
 
 
-run_lab_2()
-
+# the worker processes of propagate_labels and run_batch may import this file, so the program runs only when it is the
+# main module
+if __name__ == '__main__':
+    if len(sys.argv) >= 3 and sys.argv[1] == '--batch':
+        # python connectedComponentsDFS.py --batch directory_or_glob [number of processes]
+        run_batch(sys.argv[2], *[int(k) for k in sys.argv[3:4]])
+    else:
+        run_lab_2()
@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from connectedComponentsDFS import DFS, UndirectedGraph, compute_components
+
+
+class ComponentGraphTest(unittest.TestCase):
+    def setUp(self):
+        # the path 0 - 1 - 2 and the edge 3 - 4
+        self.graph = UndirectedGraph()
+        for vertex in range(5):
+            self.graph.init_key(vertex)
+        self.graph.add_edge(0, 1)
+        self.graph.add_edge(1, 2)
+        self.graph.add_edge(3, 4)
+
+    def test_dfs_component_is_one_component(self):
+        component = DFS(self.graph, 0, set())
+        self.assertEqual(component.nr_of_components(), 1)
+        self.assertTrue(component.same_component(0, 2))
+
+    def test_component_as_graph_is_one_component(self):
+        components = compute_components(self.graph)
+        for label in range(components.nr_of_components()):
+            self.assertEqual(components.component_as_graph(label).nr_of_components(), 1)
+
+    def test_component_graph_keeps_tracking_new_edges(self):
+        component = DFS(self.graph, 3, set())
+        component.init_key(5)
+        self.assertEqual(component.nr_of_components(), 2)
+        component.add_edge(4, 5)
+        self.assertEqual(component.nr_of_components(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
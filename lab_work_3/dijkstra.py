@@ -1,6 +1,23 @@
 import random
 import copy
 import heapq
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import OrderedDict, deque
+from itertools import chain, compress, repeat
+from operator import add, lt, sub
+from multiprocessing import shared_memory
+
+# the graph files (the text formats and the binary graph format) are shared by all the labs
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_files import BINARY_MAGIC, BINARY_VERSION, BINARY_HEADER, IDENTITY_VERTICES, BIG_ENDIAN, \
+    binary_graph_views, is_binary_graph_file, map_binary_graph_file, parse_graph_file
 
 
 class DirectedGraph:
@@ -12,12 +29,26 @@ a list of OUTbound neighbours (the list will be empty if the vertex is isolated)
 list of INbound neighbours (the list will be empty if the vertex is isolated);
         > self._dictCOST = a dictionary in which every key, which is a tuple (x, y) corresponding to each edge of
 the graph, has as value the cost of that edge.
+    The "lists" of neighbours are in fact dictionaries whose keys are the neighbours (and whose values are None): they
+keep the insertion order, like a list, but checking if a vertex is a neighbour takes O(1) time instead of O(degree).
     '''
 
     def __init__(self):
         self._dictIN = {}
         self._dictOUT = {}
         self._dictCOST = {}
+        # the last frozen (CSR) view of the graph; it is dropped whenever the graph is modified
+        self._frozen = None
+        # a counter which changes with every modification, so that cached results can be recognized as outdated
+        self._version = 0
+
+    def _modified(self):
+        # called by every method which modifies the graph
+        self._frozen = None
+        self._version += 1
+
+    def get_version(self):
+        return self._version
 
     def get_dictOUT(self):
         # a getter for the dictionary of outbound neighbours
@@ -32,8 +63,9 @@ the graph, has as value the cost of that edge.
         return self._dictCOST
 
     def initialize_dict_key(self, key):
-        self._dictIN[key] = []
-        self._dictOUT[key] = []
+        self._dictIN[key] = {}
+        self._dictOUT[key] = {}
+        self._modified()
 
     def is_vertex(self, x):
         # if x is a key in the dictionary of vertices and their successors, it is a vertex of the graph:
@@ -52,9 +84,45 @@ the graph, has as value the cost of that edge.
         if self.is_edge(x, y) is True:
             raise ValueError("The edge already exists!")
 
-        self._dictOUT[x].append(y)
-        self._dictIN[y].append(x)
+        self._dictOUT[x][y] = None
+        self._dictIN[y][x] = None
+        self._dictCOST[(x, y)] = c
+        self._modified()
+
+    def add_edges(self, sources, targets, costs):
+        '''
+        Adds many edges at once: the i-th edge goes from sources[i] to targets[i] and has the cost costs[i]. The
+    edges are checked all together before any of them is added: every endpoint must be a vertex and no edge may
+    appear twice in the batch or be already in the graph (these checks are made with set operations, instead of
+    calling is_edge for every edge).
+        '''
+        edges = list(zip(sources, targets))
+        if not self._dictOUT.keys() >= set(sources) or not self._dictOUT.keys() >= set(targets):
+            raise ValueError("Invalid vertexes!")
+        new_costs = dict(zip(edges, costs))
+        if len(new_costs) != len(edges) or not new_costs.keys().isdisjoint(self._dictCOST.keys()):
+            raise ValueError("The edge already exists!")
+        dict_out = self._dictOUT
+        dict_in = self._dictIN
+        for x, y in edges:
+            dict_out[x][y] = None
+            dict_in[y][x] = None
+        self._dictCOST.update(new_costs)
+        self._modified()
+
+    def remove_edge(self, x, y):
+        if self.is_edge(x, y) is False:
+            raise ValueError("Non-existent edge!")
+        del self._dictOUT[x][y]
+        del self._dictIN[y][x]
+        del self._dictCOST[(x, y)]
+        self._modified()
+
+    def modify_cost(self, x, y, c):
+        if self.is_edge(x, y) is False:
+            raise ValueError("Non-existent edge!")
         self._dictCOST[(x, y)] = c
+        self._modified()
 
     def nr_of_vertices(self):
         return len(self._dictOUT.keys())
@@ -86,8 +154,210 @@ the graph, has as value the cost of that edge.
             raise ValueError("The vertex already exists!")
         self.initialize_dict_key(x)
 
+    def freeze(self):
+        '''
+        Returns an immutable compressed-sparse-row view of the graph (see FrozenDirectedGraph). The view is built
+    only once and it is reused until the graph is modified again.
+        '''
+        if self._frozen is None:
+            self._frozen = FrozenDirectedGraph.from_dicts(self._dictOUT, self._dictIN, self._dictCOST)
+        return self._frozen
+
+    def __str__(self):
+        return str({x: list(self._dictOUT[x]) for x in self._dictOUT})
+
+
+class FrozenDirectedGraph:
+    '''
+    An immutable compressed-sparse-row (CSR) view of a DirectedGraph. Every vertex has an index from 0 to n-1 (its
+position in self._vertices) and the edges are stored in flat arrays of integers:
+        > self._out_offsets = an array of n+1 positions; the outbound neighbours of the vertex with the index i are
+self._out_targets[self._out_offsets[i]:self._out_offsets[i+1]] (as indices) and the costs of those edges are
+found at the same positions in self._out_costs;
+        > self._in_offsets, self._in_sources, self._in_costs = the same thing, for the inbound neighbours.
+    Compared to the dictionaries of lists and the dictionary of (x, y) tuples, an edge costs only a few machine words
+and the neighbours of a vertex are contiguous in memory.
+    The arrays can be any sequences of integers (array objects, or memoryviews over a memory-mapped file, see
+open_binary_graph). If the vertices are exactly 0, 1, ..., n-1, self._vertices is range(n) and a vertex is its own
+index; otherwise the dictionary from vertices to indices is built the first time it is needed.
+    '''
+    def __init__(self, vertices, out_offsets, out_targets, out_costs, in_offsets, in_sources, in_costs):
+        self._vertices = vertices
+        self._index = None
+        self._identity = isinstance(vertices, range) and vertices.start == 0 and vertices.step == 1
+        self._out_offsets = out_offsets
+        self._out_targets = out_targets
+        self._out_costs = out_costs
+        self._in_offsets = in_offsets
+        self._in_sources = in_sources
+        self._in_costs = in_costs
+        self._cost_range = None
+        # Johnson's potentials and the reduced costs (see get_potentials), computed the first time they are needed
+        self._potentials = None
+        self._negative_cycle = None
+        self._reduced_costs = None
+        self._reduced_cost_range = None
+
+    @staticmethod
+    def from_dicts(dict_out, dict_in, dict_cost):
+        '''
+        Builds the view from the three dictionaries of a DirectedGraph. The vertices keep the order of the keys
+    of dict_out and the neighbours of every vertex keep the order of its list.
+        '''
+        vertices = list(dict_out.keys())
+        index = {vertex: i for i, vertex in enumerate(vertices)}
+        if all(vertex == i for vertex, i in index.items()):
+            vertices = range(len(vertices))
+        out_offsets, out_targets, out_costs = array('q', [0]), array('q'), array('q')
+        in_offsets, in_sources, in_costs = array('q', [0]), array('q'), array('q')
+        for x in vertices:
+            out_targets.extend([index[y] for y in dict_out[x]])
+            out_costs.extend([dict_cost[(x, y)] for y in dict_out[x]])
+            out_offsets.append(len(out_targets))
+            in_sources.extend([index[y] for y in dict_in[x]])
+            in_costs.extend([dict_cost[(y, x)] for y in dict_in[x]])
+            in_offsets.append(len(in_sources))
+        return FrozenDirectedGraph(vertices, out_offsets, out_targets, out_costs, in_offsets, in_sources, in_costs)
+
+    def freeze(self):
+        # the view is already frozen
+        return self
+
+    def get_version(self):
+        # a frozen view never changes
+        return 0
+
+    def get_out_arrays(self):
+        # a getter for the (offsets, targets, costs) arrays of the outbound edges
+        return self._out_offsets, self._out_targets, self._out_costs
+
+    def get_in_arrays(self):
+        # a getter for the (offsets, sources, costs) arrays of the inbound edges
+        return self._in_offsets, self._in_sources, self._in_costs
+
+    def get_cost_range(self):
+        # returns (the smallest cost, the largest cost) of the edges, (0, 0) if there are no edges
+        if self._cost_range is None:
+            self._cost_range = (min(self._in_costs, default=0), max(self._in_costs, default=0))
+        return self._cost_range
+
+    def get_potentials(self):
+        '''
+        Returns the potentials of Johnson's algorithm: an array p (by index) such that every reduced cost
+    c(x, y) + p[x] - p[y] is non-negative, so that Dijkstra's algorithm gives the right walks on the reduced costs (the
+    cost of every walk from x to y changes by the same amount, p[x] - p[y]). If all the costs are already non-negative,
+    it returns None.
+        The potentials are computed only once for the view, by johnson_potentials (O(n*m) time in the worst case).
+    If the graph has a negative cost cycle, a ValueError describing the cycle is raised (every time).
+        '''
+        if self.get_cost_range()[0] >= 0:
+            return None
+        if self._potentials is None and self._negative_cycle is None:
+            self._potentials, self._negative_cycle = johnson_potentials(self)
+        if self._negative_cycle is not None:
+            raise ValueError("The graph has a negative cost cycle: " + str(self._negative_cycle))
+        return self._potentials
+
+    def get_reduced_costs(self):
+        '''
+        Returns (the reduced outbound costs, the reduced inbound costs), in the same positions as the costs of
+    get_out_arrays and get_in_arrays. Without potentials, these are the original costs.
+        '''
+        potentials = self.get_potentials()
+        if potentials is None:
+            return self._out_costs, self._in_costs
+        if self._reduced_costs is None:
+            out_costs = array('q', self._out_costs)
+            in_costs = array('q', self._in_costs)
+            for x in range(len(self._vertices)):
+                for position in range(self._out_offsets[x], self._out_offsets[x + 1]):
+                    out_costs[position] += potentials[x] - potentials[self._out_targets[position]]
+                for position in range(self._in_offsets[x], self._in_offsets[x + 1]):
+                    in_costs[position] += potentials[self._in_sources[position]] - potentials[x]
+            self._reduced_costs = (out_costs, in_costs)
+        return self._reduced_costs
+
+    def get_reduced_cost_range(self):
+        # returns (the smallest, the largest) reduced cost
+        if self._reduced_cost_range is None:
+            in_costs = self.get_reduced_costs()[1]
+            self._reduced_cost_range = (min(in_costs, default=0), max(in_costs, default=0))
+        return self._reduced_cost_range
+
+    def get_vertices(self):
+        # a getter for the sequence of vertices (the vertex with the index i is on the position i)
+        return self._vertices
+
+    def get_edge_list(self):
+        '''
+        Returns (vertices, sources, targets, costs), the same edge list as parse_graph_file: the i-th edge goes from
+    sources[i] to targets[i] and has the cost costs[i].
+        '''
+        vertices = list(self._vertices)
+        sources, targets = array('q'), array('q')
+        for i in range(len(vertices)):
+            degree = self._out_offsets[i + 1] - self._out_offsets[i]
+            sources.extend([vertices[i]] * degree)
+        targets.extend([vertices[j] for j in self._out_targets])
+        return vertices, sources, targets, array('q', self._out_costs)
+
+    def index_of(self, x):
+        # returns the index of the vertex x, or None if x is not a vertex of the graph
+        if self._identity:
+            return x if x in self._vertices else None
+        if self._index is None:
+            self._index = {vertex: i for i, vertex in enumerate(self._vertices)}
+        return self._index.get(x)
+
+    def vertex_at(self, i):
+        # returns the vertex which has the index i
+        return self._vertices[i]
+
+    def is_vertex(self, x):
+        return self.index_of(x) is not None
+
+    def nr_of_vertices(self):
+        return len(self._vertices)
+
+    def nr_of_edges(self):
+        return len(self._out_targets)
+
+    def parse_vertices(self):
+        return list(self._vertices)
+
+    def is_edge(self, x, y):
+        i, j = self.index_of(x), self.index_of(y)
+        if i is None or j is None:
+            return False
+        for position in range(self._out_offsets[i], self._out_offsets[i + 1]):
+            if self._out_targets[position] == j:
+                return True
+        return False
+
+    def get_cost(self, x, y):
+        if self.is_vertex(x) is False or self.is_vertex(y) is False:
+            raise ValueError("Invalid vertices!")
+        i, j = self.index_of(x), self.index_of(y)
+        for position in range(self._out_offsets[i], self._out_offsets[i + 1]):
+            if self._out_targets[position] == j:
+                return self._out_costs[position]
+        raise ValueError("Non-existent edge!")
+
+    def get_outbound_neighbours(self, x):
+        if self.is_vertex(x) is False:
+            raise ValueError("This is not a vertex!")
+        i = self.index_of(x)
+        return [self._vertices[j] for j in self._out_targets[self._out_offsets[i]:self._out_offsets[i + 1]]]
+
+    def get_inbound_neighbours(self, x):
+        if self.is_vertex(x) is False:
+            raise ValueError("This is not a vertex!")
+        i = self.index_of(x)
+        return [self._vertices[j] for j in self._in_sources[self._in_offsets[i]:self._in_offsets[i + 1]]]
+
     def __str__(self):
-        return str(self._dictOUT)
+        return str({x: self.get_outbound_neighbours(x) for x in self._vertices})
+
 
 
 def read_graph_from_file(filename):
@@ -99,78 +369,1489 @@ all of the integer numbers in range (0, n).
 of the graph and their cost (the isolated vertices were stored with the format: the_isolated_vertex -1 0). In this
 case, the graph will have as vertices the integers which define the endpoints of the edges, plus the isolated
 vertices.
+    A file written in the binary format (see write_binary_graph in lab 1) is not parsed at all: it is memory-mapped and
+its frozen view is returned, which is all that the search algorithms need. The view cannot be modified, so the
+structures which change the graph (DynamicShortestPathTree) raise a ValueError for it.
     '''
-    f = open(filename)
+    if is_binary_graph_file(filename):
+        return open_binary_graph(filename)
+    vertices, sources, targets, costs = parse_graph_file(filename)
     graph = DirectedGraph()
-    # read the first line of the text file:
-    value = f.readline()
-    value = value[:-1].split(' ')
-    # if the text file contains on the first line 2 values (n and m), that means that the graph has as vertices
-    # all of the numbers in range (0, n)
-    if len(value) == 2:
-        n = int(value[0])
-        m = int(value[1])
-        for i in range(n):
-            graph.initialize_dict_key(i)
-        for i in range(m):
-            value = f.readline()
-            value = value[:-1].split(' ')
-            graph.add_edge(int(value[0]), int(value[1]), int(value[2]))
-    else:
-        # else, the text file contains only the edges and their costs. The isolated vertices were stored with the
-        # format: the_isolated_vertex -1 0
-        while True:
-            try:
-                x = int(value[0])
-                y = int(value[1])
-                cost = int(value[2])
-                if graph.is_vertex(x) is False:
-                    graph.initialize_dict_key(x)
-                if y != -1 and graph.is_vertex(y) is False:
-                    graph.initialize_dict_key(y)
-                if y != -1:
-                    graph.add_edge(x, y, cost)
-                value = f.readline()
-                value = value[:-1].split(' ')
-                if len(value) != 3:
-                    break
-            except EOFError:
-                break
-    f.close()
+    for vertex in vertices:
+        graph.initialize_dict_key(vertex)
+    graph.add_edges(sources, targets, costs)
     return graph
 
 
+def open_binary_graph(filename):
+    '''
+    Opens a file written by write_binary_graph without reading it: the file is memory-mapped (read only) and the
+arrays of the returned FrozenDirectedGraph are views over the mapped memory, so nothing is copied. Opening a file only
+checks the offsets and the neighbours (one pass over them, see binary_graph_views in graph_files.py), the costs are
+loaded only when an algorithm touches them and all the processes which open the same file share the same pages of the
+page cache.
+    '''
+    return view_binary_graph(map_binary_graph_file(filename))
+
+
+def binary_graph_sections(frozen, out_costs=None, in_costs=None):
+    '''
+    Returns (the header, the list of the arrays) of the frozen view in the binary graph format, as they are written by
+write_binary_graph in lab 1. Other costs can be given instead of the costs of the view (e.g. the reduced costs).
+    '''
+    vertices = frozen.get_vertices()
+    out_offsets, out_targets, frozen_out_costs = frozen.get_out_arrays()
+    in_offsets, in_sources, frozen_in_costs = frozen.get_in_arrays()
+    flags = BIG_ENDIAN if sys.byteorder == 'big' else 0
+    sections = []
+    if isinstance(vertices, range) and vertices.start == 0 and vertices.step == 1:
+        flags |= IDENTITY_VERTICES
+    else:
+        sections.append(array('q', vertices))
+    sections.extend([out_offsets, out_targets, frozen_out_costs if out_costs is None else out_costs,
+                     in_offsets, in_sources, frozen_in_costs if in_costs is None else in_costs])
+    header = BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, flags, frozen.nr_of_vertices(), frozen.nr_of_edges())
+    return header, sections
+
+
+def view_binary_graph(buffer):
+    # builds the FrozenDirectedGraph whose arrays are views over a buffer in the binary graph format (without copying)
+    return FrozenDirectedGraph(*binary_graph_views(buffer))
+
+
+def johnson_potentials(frozen):
+    '''
+    Computes the potentials of Johnson's algorithm for a FrozenDirectedGraph: p[x] = the minimum cost of a walk which
+ends in x, starting from a virtual vertex which has an edge of cost 0 to every vertex. They are computed with the
+queue based Bellman-Ford algorithm, on the outbound arrays.
+    Returns (potentials, None), or (None, cycle) if the graph has a negative cost cycle, where cycle is the list of
+the vertices of such a cycle, in the order of its edges. A vertex which has been improved n times has a walk of
+improvements longer than the graph, so the predecessors are followed from it to look for the cycle.
+    '''
+    out_offsets, out_targets, out_costs = frozen.get_out_arrays()
+    n = frozen.nr_of_vertices()
+    potentials = array('q', [0]) * n
+    prev = array('q', [-1]) * n
+    improvements = array('q', [0]) * n
+    in_queue = bytearray(b'\x01') * n
+    queue = deque(range(n))
+    while queue:
+        x = queue.popleft()
+        in_queue[x] = 0
+        for position in range(out_offsets[x], out_offsets[x + 1]):
+            y = out_targets[position]
+            if potentials[x] + out_costs[position] < potentials[y]:
+                potentials[y] = potentials[x] + out_costs[position]
+                prev[y] = x
+                improvements[y] += 1
+                if improvements[y] % n == 0:
+                    cycle = _find_predecessor_cycle(prev, y)
+                    if cycle is not None:
+                        return None, [frozen.vertex_at(z) for z in cycle]
+                if not in_queue[y]:
+                    in_queue[y] = 1
+                    queue.append(y)
+    return potentials, None
+
+
+def _find_predecessor_cycle(prev, x):
+    # follows the predecessors from x; returns the cycle it runs into (in the order of the edges) or None
+    seen = {}
+    while x != -1 and x not in seen:
+        seen[x] = len(seen)
+        x = prev[x]
+    if x == -1:
+        return None
+    cycle = [x]
+    y = prev[x]
+    while y != x:
+        cycle.append(y)
+        y = prev[y]
+    cycle.reverse()
+    return cycle
+
+
+NOT_REACHED = -2     # the value of next[i] for a vertex i from which the end vertex cannot be reached
+INFINITY = 1 << 62   # the distance stored in arrays of distances for the vertices which cannot be reached
+
+
+class ReverseShortestPathTree:
+    '''
+    The result of a backwards Dijkstra search from an end vertex, kept in two arrays indexed by the vertex indices
+of the frozen view:
+        > self._next[i] = the index of the vertex which comes after the vertex i in a minimum cost walk from i to the
+end vertex (-1 for the end vertex itself and NOT_REACHED if there is no walk from i to the end vertex);
+        > self._dist[i] = the cost of that walk.
+    Since the search starts from the end vertex, one tree answers the queries for every possible start vertex.
+    A tree of a search which stopped early also keeps self._reached, the list of the indices of the vertices it
+contains (for a complete tree, self._reached is None and the arrays are parsed directly).
+    If the search used the reduced costs of Johnson's potentials, self._dist holds reduced costs and they are turned
+back into real costs by _distance.
+    '''
+    def __init__(self, frozen, end, next, dist, reached=None, potentials=None):
+        self._frozen = frozen
+        self._end = end
+        self._next = next
+        self._dist = dist
+        self._reached = reached
+        self._potentials = potentials
+
+    def _distance(self, i):
+        # the real cost of the walk from the vertex with the index i to the end vertex
+        if self._potentials is None:
+            return self._dist[i]
+        return self._dist[i] - self._potentials[i] + self._potentials[self._frozen.index_of(self._end)]
+
+    def get_end(self):
+        return self._end
+
+    def nbytes(self):
+        # the memory used by the two arrays
+        return len(self._next) * self._next.itemsize + len(self._dist) * self._dist.itemsize
+
+    def reaches(self, start):
+        # True if there is a walk from start to the end vertex
+        s = self._frozen.index_of(start)
+        return s is not None and self._next[s] != NOT_REACHED
+
+    def get_walk(self, start):
+        '''
+        Returns (next, dist) for the minimum cost walk from start to the end vertex, in the format of dijkstra, but
+    containing only the vertices of the walk, or None if there is no such walk. It takes O(length of the walk) time.
+        '''
+        if self.reaches(start) is False:
+            return None
+        vertex_at = self._frozen.vertex_at
+        next = dict()
+        dist = dict()
+        x = self._frozen.index_of(start)
+        while x != -1:
+            y = self._next[x]
+            next[vertex_at(x)] = None if y == -1 else vertex_at(y)
+            dist[vertex_at(x)] = self._distance(x)
+            x = y
+        return (next, dist)
+
+    def get_distances(self):
+        # returns the array of the distances to the end vertex (by index), INFINITY for the vertices not reached
+        return array('q', [INFINITY if self._next[i] == NOT_REACHED else self._distance(i)
+                           for i in range(len(self._next))])
+
+    def as_dicts(self):
+        # returns the whole tree as the (next, dist) dictionaries of dijkstra
+        vertex_at = self._frozen.vertex_at
+        next = dict()
+        dist = dict()
+        for x in (range(len(self._next)) if self._reached is None else self._reached):
+            y = self._next[x]
+            if y != NOT_REACHED:
+                next[vertex_at(x)] = None if y == -1 else vertex_at(y)
+                dist[vertex_at(x)] = self._distance(x)
+        return (next, dist)
+
+
+BUCKET_QUEUE_MAX_COST = 1024     # the largest edge cost for which the searches use a BucketQueue
+
+
+class BucketQueue:
+    '''
+    A monotone priority queue for integer keys (Dial's algorithm), for a Dijkstra search in which every cost is an
+integer from 0 to max_cost. The keys which are in the queue at the same time are all between the last popped key and
+that key plus max_cost, so they fit in a circular array of max_cost + 1 buckets (the key k is in the bucket
+k % (max_cost + 1)). push is O(1) and pop advances to the next non-empty bucket, so there are no heap comparisons and
+no (key, vertex) tuples.
+    '''
+    def __init__(self, max_cost):
+        self._buckets = [[] for i in range(max_cost + 1)]
+        self._size = 0
+        self._current = 0       # the key of the last popped element
+
+    def __len__(self):
+        return self._size
+
+    def push(self, key, x):
+        self._buckets[key % len(self._buckets)].append(x)
+        self._size += 1
+
+    def pop(self):
+        # removes and returns an element with the smallest key
+        buckets = self._buckets
+        current = self._current
+        bucket = buckets[current % len(buckets)]
+        while not bucket:
+            current += 1
+            bucket = buckets[current % len(buckets)]
+        self._current = current
+        self._size -= 1
+        return bucket.pop()
+
+
+class HeapQueue:
+    # the same interface as BucketQueue, over heapq, for any costs
+    def __init__(self):
+        self._heap = []
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, key, x):
+        heapq.heappush(self._heap, (key, x))
+
+    def pop(self):
+        return heapq.heappop(self._heap)[1]
+
+
+def make_priority_queue(frozen):
+    # chooses a BucketQueue when all the (reduced) costs are small non-negative integers, else a HeapQueue
+    smallest, largest = frozen.get_reduced_cost_range()
+    if 0 <= smallest and largest <= BUCKET_QUEUE_MAX_COST:
+        return BucketQueue(largest)
+    return HeapQueue()
+
+
+def shortest_path_tree(graph, end, start=None):
+    '''
+    Runs the backwards Dijkstra algorithm from the end vertex, on the frozen (CSR) view of the graph, and returns the
+whole ReverseShortestPathTree (the minimum cost walks from every vertex to the end vertex).
+    A vertex is settled when it is popped from the priority queue for the first time; the other entries of the same
+vertex are stale and they are skipped. If a start vertex is given, the search stops as soon as the start vertex is
+settled and the returned tree contains only the settled vertices (which include the whole walk from start).
+    The priority queue is given by make_priority_queue. If the graph has negative costs, the search runs on the
+reduced costs of Johnson's potentials (see FrozenDirectedGraph.get_potentials).
+    '''
+    frozen = graph.freeze()
+    if frozen.is_vertex(end) is False:
+        raise ValueError("This is not a vertex!")
+    in_offsets, in_sources, in_costs = frozen.get_in_arrays()
+    potentials = frozen.get_potentials()
+    in_costs = frozen.get_reduced_costs()[1]
+    n = frozen.nr_of_vertices()
+    next = array('q', [NOT_REACHED]) * n
+    dist = array('q', [0]) * n
+    settled = bytearray(n)
+    priority_queue = make_priority_queue(frozen)
+    push = priority_queue.push
+    pop = priority_queue.pop
+    e = frozen.index_of(end)
+    s = None if start is None else frozen.index_of(start)
+    push(0, e)
+    next[e] = -1
+    reached = [e]
+    while len(priority_queue) > 0:
+        x = pop()
+        if settled[x]:
+            continue
+        settled[x] = 1
+        if x == s:
+            break
+        for position in range(in_offsets[x], in_offsets[x + 1]):
+            y = in_sources[position]
+            if next[y] == NOT_REACHED:
+                reached.append(y)
+            elif settled[y] or dist[x] + in_costs[position] >= dist[y]:
+                continue
+            dist[y] = dist[x] + in_costs[position]
+            push(dist[y], y)
+            next[y] = x
+    if start is None:
+        return ReverseShortestPathTree(frozen, end, next, dist, None, potentials)
+    for x in reached:
+        if not settled[x]:
+            next[x] = NOT_REACHED
+    return ReverseShortestPathTree(frozen, end, next, dist, [x for x in reached if settled[x]], potentials)
+
+
 def dijkstra(graph, start, end):
     '''
-    Input:  - graph = the graph in which we search for the minimum cost walk
+    Input:  - graph = the graph in which we search for the minimum cost walk (a DirectedGraph or its frozen view)
             - start = the start vertex
             - end = the end vertex
     Output: - next = a dictionary in which every key is a node. The value is the vertex which comes
 after the key vertex in the minimum cost walk.
             - dist = a dictionary in which every key is a node and the value is the distance between
 the key vertex and the end vertex. The minimum distance we search for will be equal to dist[start].
+    The search itself is made by shortest_path_tree, on the frozen (CSR) view of the graph, and it stops as soon as
+the start vertex is settled, so the dictionaries contain only the vertices settled until then.
     '''
-    next = dict()
-    dist = dict()
-    priority_queue = []
-    heapq.heappush(priority_queue, (0, end))
-    dist[end] = 0
+    frozen = graph.freeze()
+    if frozen.is_vertex(end) is False:
+        raise ValueError("This is not a vertex!")
+    if frozen.is_vertex(start) is False:
+        return None
+    tree = shortest_path_tree(frozen, end, start)
+    if tree.reaches(start) is False:         # we could not find any walk between start and end
+        return None
+    return tree.as_dicts()
+
+
+def bidirectional_dijkstra(graph, start, end):
+    '''
+    Searches for a minimum cost walk from start to end with two Dijkstra searches at the same time: a forward one from
+the start vertex (on the outbound edges) and the usual backwards one from the end vertex (on the inbound edges). At
+every step, the search with the smaller priority queue is advanced. Every edge relaxed between the two searched
+regions gives a candidate walk; the best candidate (of cost mu) is the minimum cost walk as soon as the sum of the
+smallest keys of the two priority queues is at least mu. With negative costs, both searches run on the reduced costs of
+Johnson's potentials and the real costs are restored on the walk.
+    Returns (next, dist) for the vertices of the walk, in the format of dijkstra, or None if there is no walk.
+    '''
+    frozen = graph.freeze()
+    if frozen.is_vertex(end) is False:
+        raise ValueError("This is not a vertex!")
+    if frozen.is_vertex(start) is False:
+        return None
+    s = frozen.index_of(start)
+    e = frozen.index_of(end)
+    if s == e:
+        return ({start: None}, {start: 0})
+    out_offsets, out_targets = frozen.get_out_arrays()[:2]
+    in_offsets, in_sources = frozen.get_in_arrays()[:2]
+    potentials = frozen.get_potentials()
+    out_costs, in_costs = frozen.get_reduced_costs()
+    dist_forward = {s: 0}
+    prev = {s: -1}
+    settled_forward = set()
+    queue_forward = [(0, s)]
+    dist_backward = {e: 0}
+    next = {e: -1}
+    settled_backward = set()
+    queue_backward = [(0, e)]
+    mu = None
+    meeting_edge = None          # the edge (x, y) of the best walk found so far: start ... x -> y ... end
+    while queue_forward and queue_backward:
+        if mu is not None and queue_forward[0][0] + queue_backward[0][0] >= mu:
+            break
+        if len(queue_forward) <= len(queue_backward):
+            distance, x = heapq.heappop(queue_forward)
+            if x in settled_forward:
+                continue
+            settled_forward.add(x)
+            for position in range(out_offsets[x], out_offsets[x + 1]):
+                y = out_targets[position]
+                new_distance = distance + out_costs[position]
+                if y not in dist_forward or new_distance < dist_forward[y]:
+                    dist_forward[y] = new_distance
+                    prev[y] = x
+                    heapq.heappush(queue_forward, (new_distance, y))
+                if y in dist_backward and (mu is None or new_distance + dist_backward[y] < mu):
+                    mu = new_distance + dist_backward[y]
+                    meeting_edge = (x, y)
+        else:
+            distance, y = heapq.heappop(queue_backward)
+            if y in settled_backward:
+                continue
+            settled_backward.add(y)
+            for position in range(in_offsets[y], in_offsets[y + 1]):
+                x = in_sources[position]
+                new_distance = distance + in_costs[position]
+                if x not in dist_backward or new_distance < dist_backward[x]:
+                    dist_backward[x] = new_distance
+                    next[x] = y
+                    heapq.heappush(queue_backward, (new_distance, x))
+                if x in dist_forward and (mu is None or dist_forward[x] + new_distance < mu):
+                    mu = dist_forward[x] + new_distance
+                    meeting_edge = (x, y)
+    if mu is None:
+        return None
+    # the walk is made of the forward part (start ... x, following prev) and the backward part (y ... end)
+    x, y = meeting_edge
+    walk = []
+    while x != -1:
+        walk.append(x)
+        x = prev[x]
+    walk.reverse()
+    forward_cost = {vertex: mu - dist_forward[vertex] for vertex in walk}
+    while y != -1:
+        walk.append(y)
+        forward_cost[y] = dist_backward[y]
+        y = next[y]
+    if potentials is not None:
+        for vertex in walk:
+            forward_cost[vertex] += potentials[e] - potentials[vertex]
+    vertex_at = frozen.vertex_at
+    next = {vertex_at(walk[i]): vertex_at(walk[i + 1]) for i in range(len(walk) - 1)}
     next[end] = None
+    dist = {vertex_at(vertex): forward_cost[vertex] for vertex in walk}
+    return (next, dist)
+
+
+def _spur_walk(frozen, tree_next, tree_dist, spur, blocked, removed):
+    '''
+    The spur search of k_shortest_walks: the minimum cost walk from the spur vertex to the end vertex which avoids the
+blocked vertices and does not start with an edge towards a vertex of removed. It is an A* search (on the outbound
+edges) guided by the distances of the reverse shortest path tree, which are lower bounds of the remaining costs. As
+soon as a settled vertex has a tree walk which avoids the blocked vertices (and the spur vertex, if its tree edge is
+removed), that tree walk completes the search, so most searches stop after a few vertices. Such a tree walk cannot
+go back through the search walk to the vertex: the first vertex of the search walk on it would have been settled
+earlier, with a free tree walk too.
+    Returns the list of (vertex, cost from the spur vertex) of the walk, as indices, or None if there is no walk.
+    '''
+    out_offsets, out_targets, out_costs = frozen.get_out_arrays()
+    free = {-1: True}        # free[x] = True if the tree walk from x can end the walk
+    for x in blocked:
+        free[x] = False
+    if tree_next[spur] in removed:
+        free[spur] = False
+
+    def is_free(x):
+        chain = []
+        while x not in free:
+            chain.append(x)
+            x = tree_next[x]
+        for y in chain:
+            free[y] = free[x]
+        return free[x]
+
+    cost_to = {spur: 0}
+    prev = {spur: -1}
+    settled = set()
+    priority_queue = [(tree_dist[spur], spur)]
+    while len(priority_queue) > 0:
+        key, x = heapq.heappop(priority_queue)
+        if x in settled:
+            continue
+        settled.add(x)
+        if is_free(x):
+            walk = [x]
+            while prev[walk[-1]] != -1:
+                walk.append(prev[walk[-1]])
+            walk.reverse()
+            result = [(z, cost_to[z]) for z in walk]
+            y = tree_next[x]
+            while y != -1:
+                result.append((y, cost_to[x] + tree_dist[x] - tree_dist[y]))
+                y = tree_next[y]
+            return result
+        for position in range(out_offsets[x], out_offsets[x + 1]):
+            y = out_targets[position]
+            if y in blocked or y in settled or tree_next[y] == NOT_REACHED or (x == spur and y in removed):
+                continue
+            if y not in cost_to or cost_to[x] + out_costs[position] < cost_to[y]:
+                cost_to[y] = cost_to[x] + out_costs[position]
+                prev[y] = x
+                heapq.heappush(priority_queue, (cost_to[y] + tree_dist[y], y))
+    return None
+
+
+def k_shortest_walks(graph, start, end, k):
+    '''
+    Returns the k minimum cost walks from start to end which do not repeat vertices (Yen's algorithm), as a list of
+(walk, cost) pairs in increasing order of cost, where walk is the list of its vertices. There are fewer than k pairs if
+there are fewer such walks.
+    The reverse shortest path tree of the end vertex (see shortest_path_tree) is computed once. It gives the first
+walk, and every spur search uses its distances as the heuristic of A* and its walks as ready-made endings (see
+_spur_walk).
+    '''
+    frozen = graph.freeze()
+    if frozen.is_vertex(end) is False:
+        raise ValueError("This is not a vertex!")
+    if k < 1:
+        raise ValueError("The number of walks must be positive!")
+    if frozen.is_vertex(start) is False:
+        return []
+    tree = shortest_path_tree(frozen, end)
+    tree_next = tree._next
+    tree_dist = tree.get_distances()
+    s = frozen.index_of(start)
+    if tree_next[s] == NOT_REACHED:
+        return []
+    # a walk is kept as (the tuple of its vertices, the tuple of the costs from start to each of them)
+    walk = [s]
+    while tree_next[walk[-1]] != -1:
+        walk.append(tree_next[walk[-1]])
+    found = [(tuple(walk), tuple(tree_dist[s] - tree_dist[x] for x in walk))]
+    candidates = []
+    seen = {found[0][0]}
+    while len(found) < k:
+        walk, costs = found[-1]
+        for i in range(len(walk) - 1):
+            root = walk[:i + 1]
+            removed = {other[i + 1] for other, other_costs in found if other[:i + 1] == root}
+            spur_walk = _spur_walk(frozen, tree_next, tree_dist, walk[i], set(root[:-1]), removed)
+            if spur_walk is None:
+                continue
+            candidate = root + tuple(x for x, cost in spur_walk[1:])
+            if candidate not in seen:
+                seen.add(candidate)
+                candidate_costs = costs[:i + 1] + tuple(costs[i] + cost for x, cost in spur_walk[1:])
+                heapq.heappush(candidates, (candidate_costs[-1], candidate, candidate_costs))
+        if len(candidates) == 0:
+            break
+        cost, candidate, candidate_costs = heapq.heappop(candidates)
+        found.append((candidate, candidate_costs))
+    vertex_at = frozen.vertex_at
+    return [([vertex_at(x) for x in walk], costs[-1]) for walk, costs in found]
+
+
+def _distance_column(frozen, potentials, end, source_indices, with_next_hops):
+    '''
+    Runs one backwards search from the end vertex and returns (the distances, the next hops) of the sources to it,
+two arrays in the order of source_indices (the next hops are None if with_next_hops is False). The distances are
+real costs: if potentials are given, the search ran on the reduced costs and they are corrected here.
+    '''
+    tree = shortest_path_tree(frozen, end)
+    next, dist = tree._next, tree._dist
+    e = frozen.index_of(end)
+    distances = array('q', [INFINITY]) * len(source_indices)
+    next_hops = array('q', [NOT_REACHED]) * len(source_indices) if with_next_hops else None
+    for i, x in enumerate(source_indices):
+        if x == -1 or next[x] == NOT_REACHED:
+            continue
+        distances[i] = dist[x] if potentials is None else dist[x] - potentials[x] + potentials[e]
+        if with_next_hops:
+            next_hops[i] = end if next[x] == -1 else frozen.vertex_at(next[x])
+    return distances, next_hops
+
+
+def _share_graph(frozen, extra_words=0):
+    '''
+    Copies the frozen view into a new block of shared memory, in the binary graph format, with the reduced costs
+instead of the costs (so the workers do not compute the potentials again), followed by Johnson's potentials if the
+graph has negative costs and by extra_words more 8-byte words, left for the caller. Returns (the block, the size of
+the graph part); the caller closes and unlinks the block.
+    '''
+    potentials = frozen.get_potentials()
+    header, sections = binary_graph_sections(frozen, *frozen.get_reduced_costs())
+    graph_size = len(header) + sum(8 * len(section) for section in sections)
+    if potentials is not None:
+        sections.append(potentials)
+    memory = shared_memory.SharedMemory(create=True, size=len(header) + sum(8 * len(section) for section in sections) +
+                                        8 * extra_words)
+    memory.buf[:len(header)] = header
+    position = len(header)
+    for section in sections:
+        memory.buf[position:position + 8 * len(section)] = memoryview(section).cast('B')
+        position += 8 * len(section)
+    return memory, graph_size
+
+
+# the state of a worker process, set by _attach_shared_graph: (the shared block, the frozen view over it, the
+# potentials or None) followed by the arguments of the task
+_shared_graph = None
+
+
+def _attach_shared_graph(name, graph_size, with_potentials, *arguments):
+    # the initializer of the worker processes: the graph (and the potentials after it) are viewed in the shared memory
+    global _shared_graph
+    memory = shared_memory.SharedMemory(name=name)
+    frozen = view_binary_graph(memory.buf[:graph_size])
+    potentials = None
+    if with_potentials:
+        potentials = memory.buf[graph_size:graph_size + 8 * frozen.nr_of_vertices()].cast('q')
+    _shared_graph = (memory, frozen, potentials) + arguments
+
+
+def _shared_distance_columns(columns):
+    # the task of a worker process of distance_matrix: the distance columns of a chunk of (column, end vertex) pairs
+    memory, frozen, potentials, source_indices, with_next_hops = _shared_graph
+    return [(j, _distance_column(frozen, potentials, end, source_indices, with_next_hops)) for j, end in columns]
+
+
+def distance_matrix(graph, sources, targets, processes=None, next_hops=False):
+    '''
+    Computes the minimum costs between every vertex of sources and every vertex of targets, with one backwards
+search per target (so the number of searches does not depend on the number of sources).
+    Output: - dist = a list with a row for every source; dist[i][j] = the minimum cost of a walk from sources[i]
+to targets[j] (an array of 8-byte integers), INFINITY if there is no such walk (or sources[i] is not a vertex);
+            - next = None, or (if next_hops is True) the rows of the next hops: next[i][j] = the vertex which comes
+after sources[i] on a minimum cost walk to targets[j] (targets[j] itself if they are the same vertex), NOT_REACHED if
+there is no such walk.
+    The searches are spread over a pool of processes (by default, one per core). The graph is not sent to the
+workers: its arrays, in the binary graph format, and Johnson's potentials (for negative costs) are copied once into a
+block of shared memory and every worker views them in place. With processes=1 (or a single target), the searches run
+in this process.
+    '''
+    frozen = graph.freeze()
+    for end in targets:
+        if frozen.is_vertex(end) is False:
+            raise ValueError("This is not a vertex!")
+    potentials = frozen.get_potentials()
+    source_indices = array('q', [frozen.index_of(x) if frozen.is_vertex(x) else -1 for x in sources])
+    dist = [array('q', [INFINITY]) * len(targets) for i in range(len(sources))]
+    next = [array('q', [NOT_REACHED]) * len(targets) for i in range(len(sources))] if next_hops else None
+
+    def fill_column(j, column):
+        distances, hops = column
+        for i in range(len(sources)):
+            dist[i][j] = distances[i]
+            if next_hops:
+                next[i][j] = hops[i]
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(targets))
+    if processes <= 1:
+        for j, end in enumerate(targets):
+            fill_column(j, _distance_column(frozen, potentials, end, source_indices, next_hops))
+        return dist, next
+    memory, graph_size = _share_graph(frozen)
+    try:
+        columns = list(enumerate(targets))
+        chunk_size = max(1, len(columns) // (4 * processes))
+        chunks = [columns[i:i + chunk_size] for i in range(0, len(columns), chunk_size)]
+        with multiprocessing.Pool(processes, _attach_shared_graph,
+                                  (memory.name, graph_size, potentials is not None, source_indices, next_hops)) as pool:
+            for results in pool.imap_unordered(_shared_distance_columns, chunks):
+                for j, column in results:
+                    fill_column(j, column)
+    finally:
+        memory.close()
+        memory.unlink()
+    return dist, next
+
+
+DELTA_STEPPING_MIN_EDGES = 1 << 18         # the smallest graph (in edges) for which delta_stepping starts processes
+DELTA_STEPPING_PARALLEL_EDGES = 1 << 15    # the smallest number of edges of a phase which is split between processes
+
+
+def _relaxation_requests(in_arrays, frontier, dist, begin, end, delta, light):
+    '''
+    Relaxes the light (cost <= delta) or the heavy (cost > delta) inbound edges of the vertices frontier[begin],
+..., frontier[end-1], whose distances to the end vertex are in dist. Returns the requests as (new distance, vertex,
+next vertex), only for the distances which decrease and with only the best request for every vertex.
+    The edges of all the vertices are handled together, by whole-array passes over the CSR arrays: their positions
+are sliced out and the light or the heavy ones which decrease a distance are picked with compress. The requests are
+merged by sorting their positions in decreasing order of the distance, so that the best request for a vertex is the
+last one written into the dictionary.
+    '''
+    in_offsets, in_sources, in_costs = in_arrays
+    vertices = frontier[begin:end]
+    firsts = list(map(in_offsets.__getitem__, vertices))
+    lasts = list(map(in_offsets.__getitem__, map((1).__add__, vertices)))
+    degrees = list(map(sub, lasts, firsts))
+    slices = list(map(slice, firsts, lasts))
+    costs = list(chain.from_iterable(map(in_costs.__getitem__, slices)))
+    chosen = list(map(delta.__ge__ if light else delta.__lt__, costs))
+    distances = list(map(add, compress(costs, chosen),
+                         compress(chain.from_iterable(map(repeat, map(dist.__getitem__, vertices), degrees)), chosen)))
+    sources = list(compress(chain.from_iterable(map(in_sources.__getitem__, slices)), chosen))
+    heads = compress(chain.from_iterable(map(repeat, vertices, degrees)), chosen)
+    better = list(map(lt, distances, map(dist.__getitem__, sources)))
+    distances = list(compress(distances, better))
+    sources = list(compress(sources, better))
+    heads = list(compress(heads, better))
+    order = sorted(range(len(distances)), key=distances.__getitem__, reverse=True)
+    best = dict(zip(map(sources.__getitem__, order), order)).values()
+    return list(zip(map(distances.__getitem__, best), map(sources.__getitem__, best), map(heads.__getitem__, best)))
+
+
+def _shared_relaxation_requests(task):
+    # the task of a worker process of delta_stepping: the requests of a range of positions of the shared frontier
+    memory, frozen, potentials, state_offset = _shared_graph
+    n = frozen.nr_of_vertices()
+    state = memory.buf[state_offset:state_offset + 16 * n].cast('q')
+    try:
+        return _relaxation_requests(frozen.get_in_arrays(), state[n:], state[:n], *task)
+    finally:
+        state.release()
+
+
+def delta_stepping(graph, end, delta=None, processes=1):
+    '''
+    Computes the minimum cost walks from every vertex to the end vertex with the delta-stepping algorithm and returns
+them as the (next, dist) dictionaries of dijkstra (for all the vertices from which the end vertex can be reached).
+    The vertices are kept in buckets of width delta by their tentative distance. The smallest non-empty bucket is
+emptied in phases: the light edges (cost <= delta) of its vertices are relaxed together, which may put vertices back
+into the same bucket, until it stays empty; then the heavy edges of all the vertices removed from it are relaxed once.
+All the relaxations of a phase are independent of each other, so a phase with many edges is split between
+the worker processes, each of which relaxes its part of the frontier by whole-array passes and merges its requests
+(see _relaxation_requests). The graph, the distances and the vertices of the phase (the frontier) are in a block of
+shared memory: the distances are updated in place and the frontier is written there for every phase, so a task is only
+a range of positions of the frontier. By default, delta is the largest cost divided by the average degree.
+    In a single process, the buckets only add work to Dijkstra's algorithm, so with processes=1, or for a graph with
+less than DELTA_STEPPING_MIN_EDGES edges (where starting the processes costs more than the search), the tree is
+computed by shortest_path_tree instead.
+    This is a fallback for machines with many cores, not a speedup: without vectorized kernels (numpy), a whole-array
+pass of CPython is not faster than the loop over the edges, so a phase costs about as much as the same relaxations in
+Dijkstra's algorithm, and the processes only win back what they lose on the synchronization of the phases when they
+run on enough cores. On one core, a graph with a million edges takes about 2.5 times longer than shortest_path_tree.
+    With negative costs, the buckets hold the reduced costs of Johnson's potentials.
+    '''
+    frozen = graph.freeze()
+    if frozen.is_vertex(end) is False:
+        raise ValueError("This is not a vertex!")
+    if processes <= 1 or frozen.nr_of_edges() < DELTA_STEPPING_MIN_EDGES:
+        return shortest_path_tree(frozen, end).as_dicts()
+    potentials = frozen.get_potentials()
+    in_arrays = (frozen.get_in_arrays()[0], frozen.get_in_arrays()[1], frozen.get_reduced_costs()[1])
+    n = frozen.nr_of_vertices()
+    if delta is None:
+        delta = max(1, frozen.get_reduced_cost_range()[1] * n // max(1, frozen.nr_of_edges()))
+    next = array('q', [NOT_REACHED]) * n
+    buckets = dict()
+    bucket_heap = []        # the indices of the non-empty buckets (and of some buckets emptied since then)
+    # the shared block: the graph, the potentials (if any), then the distances and the frontier (n values each)
+    memory, graph_size = _share_graph(frozen, 2 * n)
+    state_offset = graph_size + (0 if potentials is None else 8 * n)
+    state = memory.buf[state_offset:state_offset + 16 * n].cast('q')
+    dist, frontier = state[:n], state[n:]
+    dist[:] = array('q', [INFINITY]) * n
+
+    def apply(requests):
+        for distance, y, x in requests:
+            if distance < dist[y]:
+                dist[y] = distance
+                next[y] = x
+                if distance // delta not in buckets:
+                    buckets[distance // delta] = []
+                    heapq.heappush(bucket_heap, distance // delta)
+                buckets[distance // delta].append(y)
+
+    def relax(vertices, light):
+        if len(vertices) < 2 or sum(in_arrays[0][x + 1] - in_arrays[0][x] for x in vertices) < \
+                DELTA_STEPPING_PARALLEL_EDGES:
+            return _relaxation_requests(in_arrays, vertices, dist, 0, len(vertices), delta, light)
+        frontier[:len(vertices)] = array('q', vertices)
+        chunk_size = -(-len(vertices) // processes)
+        tasks = [(i, min(i + chunk_size, len(vertices)), delta, light) for i in range(0, len(vertices), chunk_size)]
+        return chain.from_iterable(pool.map(_shared_relaxation_requests, tasks))
+
+    pool = multiprocessing.Pool(processes, _attach_shared_graph,
+                                (memory.name, graph_size, potentials is not None, state_offset))
+    try:
+        apply([(0, frozen.index_of(end), -1)])
+        while bucket_heap:
+            i = heapq.heappop(bucket_heap)
+            removed = []
+            while i in buckets:
+                # the vertices whose distance has decreased to another bucket are stale entries of this one
+                frontier_vertices = list(dict.fromkeys(x for x in buckets.pop(i) if dist[x] // delta == i))
+                removed.extend(frontier_vertices)
+                apply(relax(frontier_vertices, True))
+            apply(relax(list(dict.fromkeys(removed)), False))
+        distances = array('q', dist)
+    finally:
+        pool.close()
+        pool.join()
+        dist.release()
+        frontier.release()
+        state.release()
+        memory.close()
+        memory.unlink()
+    return ReverseShortestPathTree(frozen, end, next, distances, None, potentials).as_dicts()
+
+
+class ShortestPathTreeCache:
+    '''
+    A least-recently-used cache of the ReverseShortestPathTree of a graph, for many end vertices. The trees are
+keyed by (end vertex, version of the graph): as soon as the graph is modified, its version changes and all the
+cached trees are dropped. When the trees use more than memory_budget bytes, the least recently used ones are
+dropped (the most recent tree is always kept).
+    A burst of queries with the same end vertex costs a single Dijkstra run, plus O(length of the walk) per query.
+    '''
+    def __init__(self, graph, memory_budget=64 * 1024 * 1024):
+        self._graph = graph
+        self._memory_budget = memory_budget
+        self._trees = OrderedDict()
+        self._nbytes = 0
+        self._version = graph.get_version()
+
+    def nbytes(self):
+        return self._nbytes
+
+    def clear(self):
+        self._trees.clear()
+        self._nbytes = 0
+
+    def get_tree(self, end):
+        version = self._graph.get_version()
+        if version != self._version:
+            # the graph was modified since the trees were computed
+            self.clear()
+            self._version = version
+        key = (end, version)
+        if key in self._trees:
+            self._trees.move_to_end(key)
+            return self._trees[key]
+        tree = shortest_path_tree(self._graph, end)
+        self._trees[key] = tree
+        self._nbytes += tree.nbytes()
+        while self._nbytes > self._memory_budget and len(self._trees) > 1:
+            key, dropped = self._trees.popitem(last=False)
+            self._nbytes -= dropped.nbytes()
+        return tree
+
+    def find_walk(self, start, end):
+        # returns the minimum cost walk from start to end in the (next, dist) format of dijkstra, or None
+        return self.get_tree(end).get_walk(start)
+
+
+class DynamicShortestPathTree:
+    '''
+    The minimum cost walks from every vertex to a fixed end vertex of a DirectedGraph with non-negative costs, kept up
+to date while the edges of the graph change (the method of Ramalingam and Reps):
+        > self._next[x] = the vertex which comes after x on its minimum cost walk (None for the end vertex);
+        > self._dist[x] = the cost of that walk;
+    only the vertices from which the end vertex can be reached are keys of the two dictionaries.
+    The edges are changed through add_edge, remove_edge and modify_cost of the tree, which change the graph and then
+repair only the part of the tree whose distances change. If the graph is modified in another way, its version
+changes and the tree is computed again from scratch at the next query.
+    A FrozenDirectedGraph (for example an opened binary graph file) cannot be modified, so it is rejected.
+    '''
+    def __init__(self, graph, end):
+        if isinstance(graph, FrozenDirectedGraph):
+            raise ValueError("The dynamic tree needs a modifiable graph, not a frozen view!")
+        if graph.is_vertex(end) is False:
+            raise ValueError("This is not a vertex!")
+        self._graph = graph
+        self._end = end
+        self._rebuild()
+
+    def _rebuild(self):
+        if any(c < 0 for c in self._graph.get_dictCOST().values()):
+            raise ValueError("The dynamic tree needs a graph with non-negative costs!")
+        self._next, self._dist = shortest_path_tree(self._graph, self._end).as_dicts()
+        self._version = self._graph.get_version()
+
+    def _check_version(self):
+        if self._version != self._graph.get_version():
+            self._rebuild()
+
+    def get_end(self):
+        return self._end
+
+    def get_distance(self, x):
+        # the minimum cost of a walk from x to the end vertex, None if there is no walk
+        self._check_version()
+        return self._dist.get(x)
+
+    def find_walk(self, start, end):
+        # returns the (next, dist) dictionaries of dijkstra for the vertices of the walk, or None if there is no walk
+        self._check_version()
+        if end != self._end:
+            raise ValueError("The tree is bound to another end vertex!")
+        if start not in self._dist:
+            return None
+        next = dict()
+        dist = dict()
+        x = start
+        while x is not None:
+            next[x] = self._next[x]
+            dist[x] = self._dist[x]
+            x = self._next[x]
+        return (next, dist)
+
+    def add_edge(self, x, y, c):
+        if c < 0:
+            raise ValueError("The dynamic tree needs a graph with non-negative costs!")
+        self._check_version()
+        self._graph.add_edge(x, y, c)
+        self._version = self._graph.get_version()
+        self._decrease(x, y, c)
+
+    def remove_edge(self, x, y):
+        self._check_version()
+        self._graph.remove_edge(x, y)
+        self._version = self._graph.get_version()
+        if self._next.get(x) == y:
+            self._increase(x)
+
+    def modify_cost(self, x, y, c):
+        if c < 0:
+            raise ValueError("The dynamic tree needs a graph with non-negative costs!")
+        self._check_version()
+        old_cost = self._graph.get_dictCOST().get((x, y))
+        self._graph.modify_cost(x, y, c)
+        self._version = self._graph.get_version()
+        if c < old_cost:
+            self._decrease(x, y, c)
+        elif c > old_cost and self._next.get(x) == y:
+            self._increase(x)
+
+    def _decrease(self, x, y, c):
+        '''
+        The edge (x, y) is new or cheaper. If it gives x a cheaper walk, the improvement spreads backwards from x with
+    a Dijkstra search which visits only the vertices whose distance decreases.
+        '''
+        if y not in self._dist or (x in self._dist and self._dist[y] + c >= self._dist[x]):
+            return
+        dict_in = self._graph.get_dictIN()
+        dict_cost = self._graph.get_dictCOST()
+        self._dist[x] = self._dist[y] + c
+        self._next[x] = y
+        priority_queue = [(self._dist[x], x)]
+        while len(priority_queue) > 0:
+            distance, u = heapq.heappop(priority_queue)
+            if distance > self._dist[u]:
+                continue
+            for w in dict_in[u]:
+                if w not in self._dist or distance + dict_cost[(w, u)] < self._dist[w]:
+                    self._dist[w] = distance + dict_cost[(w, u)]
+                    self._next[w] = u
+                    heapq.heappush(priority_queue, (self._dist[w], w))
+
+    def _increase(self, x):
+        '''
+        The tree edge which leaves x was removed or it became more expensive. First, the affected vertices are found
+    among the vertices whose walk goes through x, in increasing order of their old distance: a vertex which has
+    another edge of positive cost to an unaffected vertex, with the same total cost, keeps its distance (and so do
+    the vertices whose walk goes through it). Then the affected vertices get their new distances with a Dijkstra
+    search which starts from their best edges to the unaffected vertices.
+        '''
+        dict_out = self._graph.get_dictOUT()
+        dict_in = self._graph.get_dictIN()
+        dict_cost = self._graph.get_dictCOST()
+        dist = self._dist
+        next = self._next
+        affected = set()
+        priority_queue = [(dist[x], x)]
+        while len(priority_queue) > 0:
+            distance, u = heapq.heappop(priority_queue)
+            for z in dict_out[u]:
+                cost = dict_cost[(u, z)]
+                if cost > 0 and z in dist and z not in affected and dist[z] + cost == distance:
+                    next[u] = z
+                    break
+            else:
+                affected.add(u)
+                for w in dict_in[u]:
+                    if next.get(w) == u:
+                        heapq.heappush(priority_queue, (dist[w], w))
+        priority_queue = []
+        for u in affected:
+            del dist[u]
+            del next[u]
+        for u in affected:
+            for z in dict_out[u]:
+                if z in dist and (u not in dist or dist[z] + dict_cost[(u, z)] < dist[u]):
+                    dist[u] = dist[z] + dict_cost[(u, z)]
+                    next[u] = z
+            if u in dist:
+                priority_queue.append((dist[u], u))
+        heapq.heapify(priority_queue)
+        while len(priority_queue) > 0:
+            distance, u = heapq.heappop(priority_queue)
+            if distance > dist[u]:
+                continue
+            for w in dict_in[u]:
+                if w in affected and (w not in dist or distance + dict_cost[(w, u)] < dist[w]):
+                    dist[w] = distance + dict_cost[(w, u)]
+                    next[w] = u
+                    heapq.heappush(priority_queue, (dist[w], w))
+
+
+def forward_distances(graph, start):
+    '''
+    Runs the (forward) Dijkstra algorithm from the start vertex, on the outbound arrays of the frozen view, and returns
+an array with the distance from start to every vertex (by index), INFINITY for the vertices which cannot be reached.
+    '''
+    frozen = graph.freeze()
+    out_offsets, out_targets, out_costs = frozen.get_out_arrays()
+    dist = array('q', [INFINITY]) * frozen.nr_of_vertices()
+    s = frozen.index_of(start)
+    dist[s] = 0
+    priority_queue = [(0, s)]
     while len(priority_queue) > 0:
         distance, x = heapq.heappop(priority_queue)
-        for y in graph.get_inbound_neighbours(x):
-            if y not in dist.keys() or dist[x] + graph.get_dictCOST()[(y, x)] < dist[y]:
-                dist[y] = dist[x] + graph.get_dictCOST()[(y, x)]
+        if distance > dist[x]:
+            continue
+        for position in range(out_offsets[x], out_offsets[x + 1]):
+            y = out_targets[position]
+            if distance + out_costs[position] < dist[y]:
+                dist[y] = distance + out_costs[position]
                 heapq.heappush(priority_queue, (dist[y], y))
-                next[y] = x
+    return dist
 
-    if start not in dist.keys():         # we could not find any walk between start and end
-        return None
-    return (next, dist)
 
+class LandmarkIndex:
+    '''
+    The preprocessing of the ALT algorithm (A*, Landmarks and the Triangle inequality), for a graph which is loaded
+once and queried many times. k landmarks are chosen and, for every landmark L, two arrays are stored:
+        > self._to_landmark[l][i] = the distance from the vertex with the index i to L (a backwards search from L);
+        > self._from_landmark[l][i] = the distance from L to the vertex with the index i (a forward search from L).
+    By the triangle inequality, for any vertices s and v: d(s, v) >= d(s, L) - d(v, L) and d(s, v) >= d(L, v) - d(L, s).
+The largest of these lower bounds is used as the heuristic of an A* version of the backwards search, which then
+settles only the vertices which look promising for the walk from s.
+    The landmarks are chosen greedily, every new landmark being the vertex farthest from the landmarks chosen so far.
+The time taken by the preprocessing and the memory used by the tables are kept in self.build_time (in seconds) and
+self.nbytes(). When the graph is modified, the landmarks are chosen again, by the next query.
+    '''
+    def __init__(self, graph, k=8):
+        self._graph = graph
+        self._k = k
+        self._build()
+
+    def _build(self):
+        started = time.perf_counter()
+        k = self._k
+        self._frozen = self._graph.freeze()
+        self._version = self._graph.get_version()
+        if any(cost < 0 for cost in self._frozen.get_out_arrays()[2]):
+            raise ValueError("The landmarks need a graph with non-negative costs!")
+        n = self._frozen.nr_of_vertices()
+        self._landmarks = []
+        self._to_landmark = []
+        self._from_landmark = []
+        # the sum of the distances to and from the closest landmark, for every vertex
+        closeness = array('q', [INFINITY]) * n
+        candidate = 0
+        while len(self._landmarks) < min(k, n):
+            landmark = self._frozen.vertex_at(candidate)
+            to_landmark = shortest_path_tree(self._frozen, landmark).get_distances()
+            from_landmark = forward_distances(self._frozen, landmark)
+            self._landmarks.append(candidate)
+            self._to_landmark.append(to_landmark)
+            self._from_landmark.append(from_landmark)
+            for i in range(n):
+                if to_landmark[i] < INFINITY and from_landmark[i] < INFINITY:
+                    closeness[i] = min(closeness[i], to_landmark[i] + from_landmark[i])
+            for i in self._landmarks:
+                closeness[i] = -1
+            # the next landmark: a vertex which is not connected (both ways) to any landmark yet, if there is one,
+            # else the farthest vertex from the landmarks
+            candidate = max(range(n), key=closeness.__getitem__)
+        self.build_time = time.perf_counter() - started
+
+    def _check_version(self):
+        if self._version != self._graph.get_version():
+            self._build()
+
+    def get_landmarks(self):
+        self._check_version()
+        return [self._frozen.vertex_at(i) for i in self._landmarks]
+
+    def nbytes(self):
+        # the memory used by the distance tables
+        return sum(len(table) * table.itemsize for table in self._to_landmark + self._from_landmark)
+
+    def find_walk(self, start, end):
+        '''
+        Returns the minimum cost walk from start to end, in the (next, dist) format of dijkstra (only the vertices of
+    the walk), or None if there is no such walk. The search is the backwards Dijkstra algorithm from end, turned
+    into A*: a vertex v is prioritized by dist[v] + (a lower bound of the cost from start to v).
+        '''
+        self._check_version()
+        frozen = self._frozen
+        if frozen.is_vertex(end) is False:
+            raise ValueError("This is not a vertex!")
+        if frozen.is_vertex(start) is False:
+            return None
+        in_offsets, in_sources, in_costs = frozen.get_in_arrays()
+        s = frozen.index_of(start)
+        e = frozen.index_of(end)
+        start_to = [table[s] for table in self._to_landmark]
+        start_from = [table[s] for table in self._from_landmark]
+
+        def lower_bound(v):
+            bound = 0
+            for l in range(len(start_to)):
+                # if v reaches the landmark and start does not, or the landmark reaches start and not v, then there
+                # is no walk from start to v (it would give a walk from start to the landmark, or from the landmark
+                # to v)
+                to_v = self._to_landmark[l][v]
+                if to_v < INFINITY:
+                    if start_to[l] == INFINITY:
+                        return INFINITY
+                    bound = max(bound, start_to[l] - to_v)
+                from_v = self._from_landmark[l][v]
+                if start_from[l] < INFINITY:
+                    if from_v == INFINITY:
+                        return INFINITY
+                    bound = max(bound, from_v - start_from[l])
+            return bound
+
+        next = {e: -1}
+        dist = {e: 0}
+        settled = set()
+        priority_queue = [(lower_bound(e), e)]
+        while len(priority_queue) > 0:
+            key, x = heapq.heappop(priority_queue)
+            if x in settled:
+                continue
+            settled.add(x)
+            if x == s:
+                break
+            for position in range(in_offsets[x], in_offsets[x + 1]):
+                y = in_sources[position]
+                new_distance = dist[x] + in_costs[position]
+                if y not in dist or new_distance < dist[y]:
+                    bound = lower_bound(y)
+                    if bound == INFINITY:
+                        continue
+                    dist[y] = new_distance
+                    next[y] = x
+                    heapq.heappush(priority_queue, (new_distance + bound, y))
+        if s not in settled:
+            return None
+        vertex_at = frozen.vertex_at
+        walk_next = dict()
+        walk_dist = dict()
+        x = s
+        while x != -1:
+            walk_next[vertex_at(x)] = None if next[x] == -1 else vertex_at(next[x])
+            walk_dist[vertex_at(x)] = dist[x]
+            x = next[x]
+        return (walk_next, walk_dist)
+
+
+# the file format of a contraction hierarchy (see ContractionHierarchy.save): a header, followed by arrays of 8-byte
+# integers
+HIERARCHY_MAGIC = b'GRAPHCH1'
+HIERARCHY_VERSION = 1
+HIERARCHY_HEADER = struct.Struct('<8sIIqqq')     # magic, version, flags, n, number of up edges, number of down edges
+
+
+class ContractionHierarchy:
+    '''
+    A contraction hierarchy of a graph with non-negative costs. The vertices are contracted one by one, in the order
+of their rank: contracting v removes it from the graph and, for every pair of edges u -> v -> w, adds the shortcut
+u -> w (with the cost of the two edges and with v as its middle vertex) unless a witness search finds a walk from u to
+w, avoiding v, which is not longer.
+    The edges of the hierarchy (original edges and shortcuts) are kept in two CSR structures, by vertex index:
+        > the upward edges: for every vertex u, the edges u -> w with rank[w] > rank[u] (self._up_offsets,
+self._up_targets, self._up_costs, self._up_middles);
+        > the downward edges: for every vertex w, the edges u -> w with rank[u] > rank[w], stored at w (self._down_offsets,
+self._down_sources, self._down_costs, self._down_middles).
+    The middle of an original edge is -1. A minimum cost walk is found by a forward search from the start vertex on
+the upward edges together with a backwards search from the end vertex on the downward edges (so both of them only go
+up in the hierarchy); the shortcuts of the walk are then unpacked recursively into original edges.
+    '''
+    def __init__(self, vertices, rank, up_offsets, up_targets, up_costs, up_middles, down_offsets, down_sources,
+                 down_costs, down_middles):
+        self._vertices = vertices
+        self._index = None
+        self._rank = rank
+        self._up_offsets = up_offsets
+        self._up_targets = up_targets
+        self._up_costs = up_costs
+        self._up_middles = up_middles
+        self._down_offsets = down_offsets
+        self._down_sources = down_sources
+        self._down_costs = down_costs
+        self._down_middles = down_middles
+
+    def index_of(self, x):
+        # returns the index of the vertex x, or None if x is not a vertex of the graph
+        if self._index is None:
+            self._index = {vertex: i for i, vertex in enumerate(self._vertices)}
+        return self._index.get(x)
+
+    def nr_of_shortcuts(self):
+        return sum(1 for middle in self._up_middles if middle != -1) + \
+               sum(1 for middle in self._down_middles if middle != -1)
+
+    def _middle(self, u, w):
+        # the middle vertex of the hierarchy edge u -> w (-1 if it is an original edge)
+        if self._rank[u] < self._rank[w]:
+            for position in range(self._up_offsets[u], self._up_offsets[u + 1]):
+                if self._up_targets[position] == w:
+                    return self._up_middles[position]
+        else:
+            for position in range(self._down_offsets[w], self._down_offsets[w + 1]):
+                if self._down_sources[position] == u:
+                    return self._down_middles[position]
+        raise ValueError("Non-existent edge!")
+
+    def _unpack(self, u, w, walk):
+        # appends to walk the vertices of the edge u -> w after u, unpacking the shortcuts
+        stack = [(u, w)]
+        while stack:
+            u, w = stack.pop()
+            middle = self._middle(u, w)
+            if middle == -1:
+                walk.append(w)
+            else:
+                stack.append((middle, w))
+                stack.append((u, middle))
+
+    def find_walk(self, start, end):
+        '''
+        Returns the minimum cost walk from start to end, in the (next, dist) format of dijkstra (only the vertices of
+    the walk), or None if there is no such walk.
+        '''
+        e = self.index_of(end)
+        if e is None:
+            raise ValueError("This is not a vertex!")
+        s = self.index_of(start)
+        if s is None:
+            return None
+        dist_forward = {s: 0}
+        prev = {s: -1}
+        queue_forward = [(0, s)]
+        dist_backward = {e: 0}
+        next = {e: -1}
+        queue_backward = [(0, e)]
+        mu = 0 if s == e else None
+        meeting_vertex = s if s == e else None
+        while queue_forward or queue_backward:
+            # a search stops when its smallest key is not smaller than the cost of the best walk found so far
+            if queue_forward and (mu is None or queue_forward[0][0] < mu):
+                distance, x = heapq.heappop(queue_forward)
+                if distance > dist_forward[x]:
+                    continue
+                if x in dist_backward and (mu is None or distance + dist_backward[x] < mu):
+                    mu = distance + dist_backward[x]
+                    meeting_vertex = x
+                for position in range(self._up_offsets[x], self._up_offsets[x + 1]):
+                    y = self._up_targets[position]
+                    if y not in dist_forward or distance + self._up_costs[position] < dist_forward[y]:
+                        dist_forward[y] = distance + self._up_costs[position]
+                        prev[y] = x
+                        heapq.heappush(queue_forward, (dist_forward[y], y))
+            elif queue_backward and (mu is None or queue_backward[0][0] < mu):
+                distance, y = heapq.heappop(queue_backward)
+                if distance > dist_backward[y]:
+                    continue
+                if y in dist_forward and (mu is None or dist_forward[y] + distance < mu):
+                    mu = dist_forward[y] + distance
+                    meeting_vertex = y
+                for position in range(self._down_offsets[y], self._down_offsets[y + 1]):
+                    x = self._down_sources[position]
+                    if x not in dist_backward or distance + self._down_costs[position] < dist_backward[x]:
+                        dist_backward[x] = distance + self._down_costs[position]
+                        next[x] = y
+                        heapq.heappush(queue_backward, (dist_backward[x], x))
+            else:
+                break
+        if mu is None:
+            return None
+        # the hierarchy walk: start ... meeting_vertex (following prev), then meeting_vertex ... end (following next)
+        hierarchy_walk = []
+        x = meeting_vertex
+        while x != -1:
+            hierarchy_walk.append(x)
+            x = prev[x]
+        hierarchy_walk.reverse()
+        x = next[meeting_vertex]
+        while x != -1:
+            hierarchy_walk.append(x)
+            x = next[x]
+        walk = [s]
+        for i in range(len(hierarchy_walk) - 1):
+            self._unpack(hierarchy_walk[i], hierarchy_walk[i + 1], walk)
+        walk_next = dict()
+        walk_dist = dict()
+        cost = mu
+        for i in range(len(walk)):
+            vertex = self._vertices[walk[i]]
+            walk_dist[vertex] = cost
+            if i + 1 < len(walk):
+                walk_next[vertex] = self._vertices[walk[i + 1]]
+                cost -= self._original_cost(walk[i], walk[i + 1])
+            else:
+                walk_next[vertex] = None
+        return (walk_next, walk_dist)
 
-def get_minimum_cost_walk(graph, start, end):
-    result = dijkstra(graph, start, end)
+    def _original_cost(self, u, w):
+        # the cost of the original edge u -> w (the cheapest hierarchy edge u -> w which is not a shortcut)
+        if self._rank[u] < self._rank[w]:
+            offsets, neighbours, costs, middles, x, y = self._up_offsets, self._up_targets, self._up_costs, \
+                                                        self._up_middles, u, w
+        else:
+            offsets, neighbours, costs, middles, x, y = self._down_offsets, self._down_sources, self._down_costs, \
+                                                        self._down_middles, w, u
+        for position in range(offsets[x], offsets[x + 1]):
+            if neighbours[position] == y and middles[position] == -1:
+                return costs[position]
+        raise ValueError("Non-existent edge!")
+
+    def save(self, filename):
+        '''
+        Writes the hierarchy in a binary file, which can be opened later with open_contraction_hierarchy (so the
+    contraction is made only once for a graph): a header of 48 bytes (the magic string b'GRAPHCH1', the version, the
+    flags, n and the numbers of upward and downward edges), then the vertices, the ranks and the eight arrays of the
+    upward and downward edges, all of them as 8-byte integers in the byte order of the machine.
+        '''
+        flags = BIG_ENDIAN if sys.byteorder == 'big' else 0
+        with open(filename, 'wb') as f:
+            f.write(HIERARCHY_HEADER.pack(HIERARCHY_MAGIC, HIERARCHY_VERSION, flags, len(self._vertices),
+                                          len(self._up_targets), len(self._down_sources)))
+            for section in (array('q', self._vertices), self._rank, self._up_offsets, self._up_targets,
+                            self._up_costs, self._up_middles, self._down_offsets, self._down_sources,
+                            self._down_costs, self._down_middles):
+                f.write(section)
+
+
+def open_contraction_hierarchy(filename):
+    # opens a hierarchy written by ContractionHierarchy.save; like open_binary_graph, the file is memory-mapped
+    with open(filename, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < HIERARCHY_HEADER.size:
+        raise ValueError("This is not a contraction hierarchy file!")
+    magic, version, flags, n, nr_of_up_edges, nr_of_down_edges = HIERARCHY_HEADER.unpack_from(buffer, 0)
+    if magic != HIERARCHY_MAGIC:
+        raise ValueError("This is not a contraction hierarchy file!")
+    if version != HIERARCHY_VERSION:
+        raise ValueError("Unsupported version of the contraction hierarchy format: " + str(version))
+    if bool(flags & BIG_ENDIAN) != (sys.byteorder == 'big'):
+        raise ValueError("The contraction hierarchy file was written with another byte order!")
+    lengths = [n, n, n + 1, nr_of_up_edges, nr_of_up_edges, nr_of_up_edges, n + 1, nr_of_down_edges,
+               nr_of_down_edges, nr_of_down_edges]
+    if len(buffer) != HIERARCHY_HEADER.size + 8 * sum(lengths):
+        raise ValueError("The contraction hierarchy file is truncated!")
+    words = memoryview(buffer)[HIERARCHY_HEADER.size:].cast('q')
+    sections = []
+    position = 0
+    for length in lengths:
+        sections.append(words[position:position + length])
+        position += length
+    return ContractionHierarchy(*sections)
+
+
+def is_contraction_hierarchy_file(filename):
+    with open(filename, 'rb') as f:
+        return f.read(len(HIERARCHY_MAGIC)) == HIERARCHY_MAGIC
+
+
+PRIORITY_WITNESS_LIMIT = 50     # the most vertices settled by a witness search which only estimates a priority
+
+
+def build_contraction_hierarchy(graph, witness_limit=500):
+    '''
+    Builds the ContractionHierarchy of a graph with non-negative costs.
+        - the order of contraction: a vertex is prioritized by its edge difference (the number of shortcuts its
+    contraction would add, minus the number of its edges) plus the number of its already contracted neighbours. The
+    priorities are updated lazily: the vertex with the smallest priority is contracted only if its recomputed
+    priority is still the smallest one, else it is pushed back in the priority queue;
+        - the witness search: a Dijkstra search from every inbound neighbour u of v, which avoids v, is bounded by the
+    cost of the longest possible shortcut from u and settles at most witness_limit vertices (a missed witness only
+    adds a useless shortcut, it never makes a query wrong).
+    '''
+    frozen = graph.freeze()
+    out_offsets, out_targets, out_costs = frozen.get_out_arrays()
+    if any(cost < 0 for cost in out_costs):
+        raise ValueError("The contraction hierarchy needs a graph with non-negative costs!")
+    n = frozen.nr_of_vertices()
+    # the remaining graph: out_edges[u][w] = in_edges[w][u] = (cost, middle vertex) of the edge u -> w
+    out_edges = [dict() for i in range(n)]
+    in_edges = [dict() for i in range(n)]
+    for u in range(n):
+        for position in range(out_offsets[u], out_offsets[u + 1]):
+            w = out_targets[position]
+            if w != u:
+                out_edges[u][w] = in_edges[w][u] = (out_costs[position], -1)
+
+    def witness_distances(u, avoided, bound, limit, targets):
+        # the search stops when all the targets are settled, or when no other target can be reached within bound
+        dist = {u: 0}
+        priority_queue = [(0, u)]
+        settled = 0
+        remaining = len(targets)
+        while priority_queue and settled < limit:
+            distance, x = heapq.heappop(priority_queue)
+            if distance > dist[x]:
+                continue
+            if distance > bound:
+                break
+            settled += 1
+            if x in targets:
+                remaining -= 1
+                if remaining == 0:
+                    break
+            for y, (cost, middle) in out_edges[x].items():
+                if y != avoided and (y not in dist or distance + cost < dist[y]):
+                    dist[y] = distance + cost
+                    heapq.heappush(priority_queue, (dist[y], y))
+        return dist
+
+    def shortcuts_of(v, limit):
+        shortcuts = []
+        if not out_edges[v]:
+            return shortcuts
+        max_out_cost = max(cost for cost, middle in out_edges[v].values())
+        for u, (in_cost, in_middle) in in_edges[v].items():
+            dist = witness_distances(u, v, in_cost + max_out_cost, limit, out_edges[v])
+            for w, (out_cost, out_middle) in out_edges[v].items():
+                if w != u and dist.get(w, INFINITY) > in_cost + out_cost:
+                    shortcuts.append((u, w, in_cost + out_cost))
+        return shortcuts
+
+    contracted_neighbours = [0] * n
+    priority_witness_limit = min(witness_limit, PRIORITY_WITNESS_LIMIT)
+
+    def priority(v):
+        # the priorities are only estimates, so their witness searches are shorter
+        return len(shortcuts_of(v, priority_witness_limit)) - len(in_edges[v]) - len(out_edges[v]) + \
+            contracted_neighbours[v]
+
+    rank = array('q', [0]) * n
+    up_edges = [None] * n
+    down_edges = [None] * n
+    priorities = [priority(v) for v in range(n)]
+    priority_queue = [(priorities[v], v) for v in range(n)]
+    heapq.heapify(priority_queue)
+    contracted = bytearray(n)
+    nr_contracted = 0
+    while priority_queue:
+        old_priority, v = heapq.heappop(priority_queue)
+        if contracted[v] or old_priority != priorities[v]:
+            continue
+        priorities[v] = priority(v)
+        if priority_queue and priorities[v] > priority_queue[0][0]:
+            heapq.heappush(priority_queue, (priorities[v], v))
+            continue
+        shortcuts = shortcuts_of(v, witness_limit)
+        rank[v] = nr_contracted
+        nr_contracted += 1
+        contracted[v] = 1
+        # the remaining edges of v all go to vertices of higher rank
+        up_edges[v] = out_edges[v]
+        down_edges[v] = in_edges[v]
+        for u in in_edges[v]:
+            del out_edges[u][v]
+        for w in out_edges[v]:
+            del in_edges[w][v]
+        out_edges[v] = dict()
+        in_edges[v] = dict()
+        for u, w, cost in shortcuts:
+            if w not in out_edges[u] or cost < out_edges[u][w][0]:
+                out_edges[u][w] = in_edges[w][u] = (cost, v)
+        # the priorities of the neighbours of v have changed
+        for x in set(up_edges[v]).union(down_edges[v]):
+            contracted_neighbours[x] += 1
+            priorities[x] = priority(x)
+            heapq.heappush(priority_queue, (priorities[x], x))
+
+    up_offsets, up_targets, up_costs, up_middles = array('q', [0]), array('q'), array('q'), array('q')
+    down_offsets, down_sources, down_costs, down_middles = array('q', [0]), array('q'), array('q'), array('q')
+    for v in range(n):
+        for w, (cost, middle) in up_edges[v].items():
+            up_targets.append(w)
+            up_costs.append(cost)
+            up_middles.append(middle)
+        up_offsets.append(len(up_targets))
+        for u, (cost, middle) in down_edges[v].items():
+            down_sources.append(u)
+            down_costs.append(cost)
+            down_middles.append(middle)
+        down_offsets.append(len(down_sources))
+    return ContractionHierarchy(frozen.parse_vertices(), rank, up_offsets, up_targets, up_costs, up_middles,
+                                down_offsets, down_sources, down_costs, down_middles)
+
+
+def benchmark_landmarks(graph, k=8, nr_of_queries=100):
+    '''
+    Compares the plain (early-exit) dijkstra with the ALT queries of a LandmarkIndex on the same random queries and
+prints the preprocessing cost, the memory of the tables and the average time of a query for both of them.
+    '''
+    frozen = graph.freeze()
+    vertices = frozen.parse_vertices()
+    queries = [(random.choice(vertices), random.choice(vertices)) for i in range(nr_of_queries)]
+    index = LandmarkIndex(frozen, k)
+    print("Preprocessing: " + str(len(index.get_landmarks())) + " landmarks in " + str(round(index.build_time, 3)) +
+          " s, using " + str(index.nbytes()) + " bytes.")
+    started = time.perf_counter()
+    expected = [dijkstra(frozen, start, end) for start, end in queries]
+    dijkstra_time = time.perf_counter() - started
+    started = time.perf_counter()
+    found = [index.find_walk(start, end) for start, end in queries]
+    landmarks_time = time.perf_counter() - started
+    for (start, end), walk, other_walk in zip(queries, expected, found):
+        if (walk is None) != (other_walk is None) or (walk is not None and walk[1][start] != other_walk[1][start]):
+            raise AssertionError("Different costs for the walk from " + str(start) + " to " + str(end))
+    print("Dijkstra: " + str(round(1000 * dijkstra_time / nr_of_queries, 3)) + " ms per query.")
+    print("ALT: " + str(round(1000 * landmarks_time / nr_of_queries, 3)) + " ms per query (speedup " +
+          str(round(dijkstra_time / max(landmarks_time, 1e-9), 2)) + "x).")
+
+
+def get_minimum_cost_walk(graph, start, end, engine=None, bidirectional=False):
+    # engine = an object which answers the queries itself (a ShortestPathTreeCache, a LandmarkIndex or a
+    # ContractionHierarchy)
+    if engine is not None:
+        result = engine.find_walk(start, end)
+    elif bidirectional is True:
+        result = bidirectional_dijkstra(graph, start, end)
+    else:
+        result = dijkstra(graph, start, end)
     if result is None:
         print("Couldn't find a walk between the given vertices!")
     else:
@@ -186,12 +1867,38 @@ def get_minimum_cost_walk(graph, start, end):
         print(s)
 
 
+def get_k_minimum_cost_walks(graph, start, end, k):
+    walks = k_shortest_walks(graph, start, end, k)
+    if len(walks) == 0:
+        print("Couldn't find a walk between the given vertices!")
+    for i, (walk, cost) in enumerate(walks):
+        print("Walk " + str(i + 1) + ": " + str(walk) + " having the cost: " + str(cost))
+
+
 def run():
     while True:
         filename = input("Enter the filename. Press x for exit. \n Filename: > ")
         if filename == 'x':
             return
-        graph = read_graph_from_file(filename)
+        if is_contraction_hierarchy_file(filename):
+            # a contraction hierarchy saved before answers the queries by itself
+            graph = None
+            engine = open_contraction_hierarchy(filename)
+        else:
+            graph = read_graph_from_file(filename)
+            k = input("Enter the number of landmarks for preprocessing (press enter to skip): > ")
+            engine = None
+            if k != '':
+                try:
+                    engine = LandmarkIndex(graph, int(k))
+                    print("Preprocessing took " + str(round(engine.build_time, 3)) + " s and uses " +
+                          str(engine.nbytes()) + " bytes.")
+                except ValueError as error:
+                    # e.g. the graph has negative costs, so the queries are answered without landmarks
+                    print(error)
+            if engine is None:
+                # the queries of this graph share the shortest path trees of their end vertices
+                engine = ShortestPathTreeCache(graph)
 
         while True:
             print("Find a lowest cost walk between the given vertices. Press x for exit.")
@@ -199,7 +1906,27 @@ def run():
             if start == 'x':
                 break
             end = input("Enter the end vertex: > ")
-            get_minimum_cost_walk(graph, int(start), int(end))
+            k = ''
+            if graph is not None:
+                k = input("Enter the number of walks (press enter for one): > ")
+            try:
+                if k != '' and int(k) != 1:
+                    # the alternative walks, which do not repeat vertices
+                    get_k_minimum_cost_walks(graph, int(start), int(end), int(k))
+                else:
+                    get_minimum_cost_walk(graph, int(start), int(end), engine)
+            except ValueError as error:
+                # e.g. the graph has a negative cost cycle, so no walk has a minimum cost
+                print(error)
 
 
-run()
+# the worker processes of distance_matrix may import this file, so the program runs only when it is the main module
+if __name__ == '__main__':
+    if len(sys.argv) >= 3 and sys.argv[1] == '--benchmark':
+        # python dijkstra.py --benchmark graph.txt [number of landmarks]
+        benchmark_landmarks(read_graph_from_file(sys.argv[2]), *[int(k) for k in sys.argv[3:4]])
+    elif len(sys.argv) == 4 and sys.argv[1] == '--contract':
+        # python dijkstra.py --contract graph.txt graph.ch (the .ch file can then be given to the REPL as a filename)
+        build_contraction_hierarchy(read_graph_from_file(sys.argv[2])).save(sys.argv[3])
+    else:
+        run()
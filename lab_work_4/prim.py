@@ -1,13 +1,47 @@
 import heapq
+import multiprocessing
+import os
+import sys
+from array import array
+from collections import deque
+from itertools import chain
+from multiprocessing import shared_memory
+
+# the graph files (the text formats and the binary graph format) are shared by all the labs
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_files import is_binary_graph_file, parse_binary_graph_file, parse_graph_file
 
 
 class UndirectedGraph:
     def __init__(self):
         self._dictNeighbours = {}
         self._dictCost = {}
+        # the last frozen (CSR) view of the graph; it is dropped whenever the graph is modified
+        self._frozen = None
+        # a counter which changes with every modification, so that cached results can be recognized as outdated
+        self._version = 0
+
+    def _modified(self):
+        # called by every method which modifies the graph
+        self._frozen = None
+        self._version += 1
+
+    def get_version(self):
+        return self._version
+
+    def freeze(self):
+        '''
+        Returns an immutable compressed-sparse-row view of the graph (see FrozenUndirectedGraph). The view is built
+    only once and it is reused until the graph is modified again.
+        '''
+        if self._frozen is None:
+            self._frozen = FrozenUndirectedGraph.from_dicts(self._dictNeighbours, self._dictCost)
+        return self._frozen
 
     def add_vertex(self, key):
         self._dictNeighbours[key] = []
+        self._modified()
 
     def is_vertex(self, x):
         return x in self._dictNeighbours.keys()
@@ -20,6 +54,42 @@ class UndirectedGraph:
             self._dictNeighbours[x].append(y)
             self._dictNeighbours[y].append(x)
             self._dictCost[(x, y)] = c
+            self._modified()
+
+    def add_edges(self, sources, targets, costs):
+        '''
+        Adds many edges at once: the i-th edge is sources[i] - targets[i] and has the cost costs[i]. Like in
+    add_edge, an edge which is already in the graph (in any direction) is skipped, but the check is made against a
+    set of all the edges, built once for the whole batch, instead of searching the lists of neighbours for every
+    edge.
+        '''
+        dict_neighbours = self._dictNeighbours
+        dict_cost = self._dictCost
+        edges = set((x, y) if x <= y else (y, x) for x, y in dict_cost.keys())
+        for x, y, c in zip(sources, targets, costs):
+            edge = (x, y) if x <= y else (y, x)
+            if edge not in edges:
+                edges.add(edge)
+                dict_neighbours[x].append(y)
+                dict_neighbours[y].append(x)
+                dict_cost[(x, y)] = c
+        self._modified()
+
+    def remove_edge(self, x, y):
+        if self.is_vertex(x) is False or self.is_vertex(y) is False or self.is_edge(x, y) is False:
+            raise ValueError("Non-existent edge!")
+        # a loop x - x is in the list of x twice (see add_edge), so both entries are removed for it too
+        self._dictNeighbours[x].remove(y)
+        self._dictNeighbours[y].remove(x)
+        self._dictCost.pop((x, y), None)
+        self._dictCost.pop((y, x), None)
+        self._modified()
+
+    def modify_cost(self, x, y, c):
+        if self.is_vertex(x) is False or self.is_vertex(y) is False or self.is_edge(x, y) is False:
+            raise ValueError("Non-existent edge!")
+        self._dictCost[(x, y) if (x, y) in self._dictCost else (y, x)] = c
+        self._modified()
 
     def parse_adjacent_vertices(self, x):
         return self._dictNeighbours[x]
@@ -47,43 +117,109 @@ class UndirectedGraph:
         return s
 
 
-def read_graph_from_file(filename):
-    f = open(filename)
-    graph = UndirectedGraph()
-    value = f.readline()
-    value = value[:-1].split(' ')
-    # if the text file contains on the first line 2 values (n and m), that means that the graph has as vertices
-    # all of the numbers in range (0, n)
-    if len(value) == 2:
-        n = int(value[0])
-        m = int(value[1])
+class FrozenUndirectedGraph:
+    '''
+    An immutable compressed-sparse-row (CSR) view of an UndirectedGraph. Every vertex has an index from 0 to n-1 (its
+position in self._vertices) and every edge x - y is stored twice, once for each of its endpoints:
+        > self._offsets = an array of n+1 positions; the neighbours of the vertex with the index i are
+self._neighbours[self._offsets[i]:self._offsets[i+1]] (as indices) and the costs of those edges are found at the
+same positions in self._costs.
+    The cost of an edge is read from the same position as its neighbour, instead of looking up both (x, y) and (y, x)
+in the dictionary of costs. If the vertices are exactly 0, 1, ..., n-1, self._vertices is range(n) and a vertex is
+its own index; otherwise the dictionary from vertices to indices is built the first time it is needed.
+    '''
+    def __init__(self, vertices, offsets, neighbours, costs):
+        self._vertices = vertices
+        self._index = None
+        self._identity = isinstance(vertices, range) and vertices.start == 0 and vertices.step == 1
+        self._offsets = offsets
+        self._neighbours = neighbours
+        self._costs = costs
+
+    @staticmethod
+    def from_dicts(dict_neighbours, dict_cost):
+        '''
+        Builds the view from the two dictionaries of an UndirectedGraph. The vertices keep the order of the keys of
+    dict_neighbours. The edges are placed by a counting sort of the dictionary of costs, whose order is the order in
+    which the edges were added, so the neighbours of every vertex keep the order of its list.
+        '''
+        vertices = list(dict_neighbours.keys())
+        index = {vertex: i for i, vertex in enumerate(vertices)}
+        n = len(vertices)
+        if all(vertex == i for vertex, i in index.items()):
+            vertices = range(n)
+        sources = array('q', [index[x] for x, y in dict_cost])
+        targets = array('q', [index[y] for x, y in dict_cost])
+        offsets = array('q', [0]) * (n + 1)
+        for x in chain(sources, targets):
+            offsets[x + 1] += 1
         for i in range(n):
-            graph.add_vertex(i)
-        for i in range(m):
-            value = f.readline()
-            value = value[:-1].split(' ')
-            graph.add_edge(int(value[0]), int(value[1]), int(value[2]))
+            offsets[i + 1] += offsets[i]
+        free = array('q', offsets)       # free[x] = the next free position among the neighbours of x
+        neighbours = array('q', [0]) * offsets[n]
+        costs = array('q', [0]) * offsets[n]
+        for x, y, c in zip(sources, targets, dict_cost.values()):
+            neighbours[free[x]] = y
+            costs[free[x]] = c
+            free[x] += 1
+            neighbours[free[y]] = x
+            costs[free[y]] = c
+            free[y] += 1
+        return FrozenUndirectedGraph(vertices, offsets, neighbours, costs)
+
+    def freeze(self):
+        # the view is already frozen
+        return self
+
+    def get_arrays(self):
+        # a getter for the (offsets, neighbours, costs) arrays
+        return self._offsets, self._neighbours, self._costs
+
+    def get_vertices(self):
+        # a getter for the sequence of vertices (the vertex with the index i is on the position i)
+        return self._vertices
+
+    def index_of(self, x):
+        # returns the index of the vertex x, or None if x is not a vertex of the graph
+        if self._identity:
+            return x if x in self._vertices else None
+        if self._index is None:
+            self._index = {vertex: i for i, vertex in enumerate(self._vertices)}
+        return self._index.get(x)
+
+    def vertex_at(self, i):
+        # returns the vertex which has the index i
+        return self._vertices[i]
+
+    def is_vertex(self, x):
+        return self.index_of(x) is not None
+
+    def nr_of_vertices(self):
+        return len(self._vertices)
+
+    def get_all_vertices(self):
+        return self._vertices
+
+    def parse_adjacent_vertices(self, x):
+        i = self.index_of(x)
+        return [self._vertices[j] for j in self._neighbours[self._offsets[i]:self._offsets[i + 1]]]
+
+    def get_cost(self, x, y):
+        i, j = self.index_of(x), self.index_of(y)
+        for position in range(self._offsets[i], self._offsets[i + 1]):
+            if self._neighbours[position] == j:
+                return self._costs[position]
+
+
+def read_graph_from_file(filename):
+    if is_binary_graph_file(filename):
+        vertices, sources, targets, costs = parse_binary_graph_file(filename)
     else:
-        # else, the text file contains only the edges and their costs. The isolated vertices were stored with the
-        # format: the_isolated_vertex -1 0
-        while True:
-            try:
-                x = int(value[0])
-                y = int(value[1])
-                cost = int(value[2])
-                if graph.is_vertex(x) is False:
-                    graph.add_vertex(x)
-                if y != -1 and graph.is_vertex(y) is False:
-                    graph.add_vertex(y)
-                if y != -1:
-                    graph.add_edge(x, y, cost)
-                value = f.readline()
-                value = value[:-1].split(' ')
-                if len(value) != 3:
-                    break
-            except EOFError:
-                break
-    f.close()
+        vertices, sources, targets, costs = parse_graph_file(filename)
+    graph = UndirectedGraph()
+    for vertex in vertices:
+        graph.add_vertex(vertex)
+    graph.add_edges(sources, targets, costs)
     return graph
 
 
@@ -116,29 +252,1066 @@ def prims_algorithm(graph, start):
     return edges
 
 
-def get_minimum_spanning_tree(graph, start):
-    result_edges = prims_algorithm(graph, start)
+class IndexedHeap:
+    '''
+    A binary min-heap of the indices 0, 1, ..., n-1, each of them with an integer key, which supports decrease_key:
+        > self._heap = the indices in the heap, in heap order;
+        > self._key[x] = the key of the index x;
+        > self._position[x] = the position of x in self._heap, -1 if x is not in the heap.
+    An index is never in the heap twice (its key is decreased instead of pushing it again), so the heap never holds
+more than n entries and there are no stale entries to skip.
+    '''
+    def __init__(self, n):
+        self._heap = array('q')
+        self._key = array('q', [0]) * n
+        self._position = array('q', [-1]) * n
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, x):
+        return self._position[x] != -1
+
+    def get_key(self, x):
+        return self._key[x]
+
+    def push(self, x, key):
+        self._key[x] = key
+        self._heap.append(x)
+        self._position[x] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def decrease_key(self, x, key):
+        self._key[x] = key
+        self._sift_up(self._position[x])
+
+    def pop(self):
+        # removes the index with the smallest key and returns (key, index)
+        heap = self._heap
+        x = heap[0]
+        last = heap.pop()
+        self._position[x] = -1
+        if len(heap) > 0:
+            heap[0] = last
+            self._position[last] = 0
+            self._sift_down(0)
+        return self._key[x], x
+
+    def _sift_up(self, i):
+        heap, key, position = self._heap, self._key, self._position
+        x = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if key[heap[parent]] <= key[x]:
+                break
+            heap[i] = heap[parent]
+            position[heap[i]] = i
+            i = parent
+        heap[i] = x
+        position[x] = i
+
+    def _sift_down(self, i):
+        heap, key, position = self._heap, self._key, self._position
+        x = heap[i]
+        n = len(heap)
+        while 2 * i + 1 < n:
+            child = 2 * i + 1
+            if child + 1 < n and key[heap[child + 1]] < key[heap[child]]:
+                child += 1
+            if key[x] <= key[heap[child]]:
+                break
+            heap[i] = heap[child]
+            position[heap[i]] = i
+            i = child
+        heap[i] = x
+        position[x] = i
+
+
+def indexed_prims_algorithm(graph, start):
+    '''
+    The same algorithm as prims_algorithm, with the same output, on the frozen (CSR) view of the graph: the state of
+the vertices is kept in arrays (in_tree, prev) and the vertices which are not in the tree yet are kept in an
+IndexedHeap, by the cost of their cheapest edge to the tree. A vertex enters the heap once and its key is decreased
+when a cheaper edge is found, so the algorithm takes O(m log n) time.
+    '''
+    frozen = graph.freeze()
+    if frozen.is_vertex(start) is False:
+        raise ValueError("This is not a vertex!")
+    offsets, neighbours, costs = frozen.get_arrays()
+    n = frozen.nr_of_vertices()
+    vertex_at = frozen.vertex_at
+    in_tree = bytearray(n)
+    prev = array('q', [-1]) * n
+    priority_queue = IndexedHeap(n)
+    edges = []
+    s = frozen.index_of(start)
+    priority_queue.push(s, 0)
+    while len(priority_queue) > 0:
+        distance, x = priority_queue.pop()
+        in_tree[x] = 1
+        if x != s:
+            edges.append((vertex_at(prev[x]), vertex_at(x)))
+        for position in range(offsets[x], offsets[x + 1]):
+            y = neighbours[position]
+            if in_tree[y]:
+                continue
+            if y not in priority_queue:
+                priority_queue.push(y, costs[position])
+                prev[y] = x
+            elif costs[position] < priority_queue.get_key(y):
+                priority_queue.decrease_key(y, costs[position])
+                prev[y] = x
+    return edges
+
+
+UNREACHED = (1 << 63) - 1    # the largest cost of an array('q'), for the vertices without an edge to the tree
+
+
+def dense_prims_algorithm(graph, start):
+    '''
+    Prim's algorithm without a priority queue, for dense graphs: the vertices which are not in the tree yet are kept on
+the first positions of the array order, and best[i] is the cost of the cheapest edge between the tree and order[i]
+(UNREACHED if there is none). The next vertex is found by two scans over the contiguous costs of these positions (min
+and index), and it leaves them by swapping it with the last one, so the algorithm takes O(n^2) time, which is less
+than the O(m log n) of a heap when m is close to n^2. Same output as prims_algorithm.
+    '''
+    frozen = graph.freeze()
+    if frozen.is_vertex(start) is False:
+        raise ValueError("This is not a vertex!")
+    offsets, neighbours, costs = frozen.get_arrays()
+    vertex_at = frozen.vertex_at
+    n = frozen.nr_of_vertices()
+    s = frozen.index_of(start)
+    order = array('q', range(n))
+    position_of = array('q', range(n))      # the position of a vertex in order, -1 for the vertices of the tree
+    best = array('q', [UNREACHED]) * n
+    best[s] = 0
+    prev = array('q', [-1]) * n
+    remaining = n
+    edges = []
+    while remaining > 0:
+        window = best[:remaining]
+        cheapest = min(window)
+        if cheapest == UNREACHED:
+            # the other vertices are not in the component of start
+            break
+        i = window.index(cheapest)
+        x = order[i]
+        remaining -= 1
+        order[i] = order[remaining]
+        best[i] = best[remaining]
+        position_of[order[i]] = i
+        position_of[x] = -1
+        if x != s:
+            edges.append((vertex_at(prev[x]), vertex_at(x)))
+        for position in range(offsets[x], offsets[x + 1]):
+            y = neighbours[position]
+            j = position_of[y]
+            if j >= 0 and costs[position] < best[j]:
+                best[j] = costs[position]
+                prev[y] = x
+    return edges
+
+
+class UnionFind:
+    '''
+    The disjoint sets of the indices 0, 1, ..., n-1: self._parent[x] = the parent of x in the tree of its set (the
+root is its own parent) and self._size[r] = the number of elements of the set whose root is r. find compresses the
+paths (every element on the path is linked to its grandparent) and union links the smaller tree under the root of the
+larger one, so the trees stay almost flat.
+    '''
+    def __init__(self, n):
+        self._parent = array('q', range(n))
+        self._size = array('q', [1]) * n
+
+    def find(self, x):
+        parent = self._parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, x, y):
+        # joins the sets of x and y; returns False if they were already the same set
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        if self._size[x] < self._size[y]:
+            x, y = y, x
+        self._parent[y] = x
+        self._size[x] += self._size[y]
+        return True
+
+
+def _component_edges(frozen, s):
+    '''
+    Returns (the indices of the vertices of the connected component of s, the sources and the positions of its edges
+in the arrays of the frozen view), every edge x - y being taken once, from the position of its smaller endpoint x.
+    '''
+    offsets, neighbours, costs = frozen.get_arrays()
+    visited = bytearray(frozen.nr_of_vertices())
+    visited[s] = 1
+    component = [s]
+    sources = []
+    positions = []
+    for x in component:
+        for position in range(offsets[x], offsets[x + 1]):
+            y = neighbours[position]
+            if x < y:
+                sources.append(x)
+                positions.append(position)
+            if not visited[y]:
+                visited[y] = 1
+                component.append(y)
+    return component, sources, positions
+
+
+def _oriented_tree(frozen, s, tree):
+    '''
+    Turns the edges of a spanning tree (a dictionary from every index to the list of its neighbours in the tree) into
+the output of prims_algorithm: (x, y) pairs of vertices, in the breadth-first order of the tree from s.
+    '''
+    vertex_at = frozen.vertex_at
+    edges = []
+    visited = {s}
+    queue = deque([s])
+    while len(queue) > 0:
+        x = queue.popleft()
+        for y in tree[x]:
+            if y not in visited:
+                visited.add(y)
+                edges.append((vertex_at(x), vertex_at(y)))
+                queue.append(y)
+    return edges
+
+
+def kruskals_algorithm(graph, start):
+    '''
+    Kruskal's algorithm on the connected component of start: the edges are sorted once by cost (a sort of their
+positions by the cost array) and every edge which joins two different sets of a UnionFind is taken. Returns the tree
+in the format of prims_algorithm, oriented from start.
+    '''
+    frozen = graph.freeze()
+    if frozen.is_vertex(start) is False:
+        raise ValueError("This is not a vertex!")
+    offsets, neighbours, costs = frozen.get_arrays()
+    s = frozen.index_of(start)
+    component, sources, positions = _component_edges(frozen, s)
+    order = sorted(range(len(positions)), key=[costs[position] for position in positions].__getitem__)
+    sets = UnionFind(frozen.nr_of_vertices())
+    tree = {x: [] for x in component}
+    nr_of_edges = 0
+    for i in order:
+        if nr_of_edges == len(component) - 1:
+            break
+        x, y = sources[i], neighbours[positions[i]]
+        if sets.union(x, y):
+            tree[x].append(y)
+            tree[y].append(x)
+            nr_of_edges += 1
+    return _oriented_tree(frozen, s, tree)
+
+
+def boruvkas_algorithm(graph, start):
+    '''
+    Boruvka's algorithm on the connected component of start: in every round, every component of the forest chooses its
+cheapest outgoing edge and all of them are added at once, so the number of components is at least halved and there
+are at most log n rounds of O(m) time. The ties are broken by the position of the edge, so the chosen edges never
+make a cycle. Returns the tree in the format of prims_algorithm, oriented from start.
+    '''
+    frozen = graph.freeze()
+    if frozen.is_vertex(start) is False:
+        raise ValueError("This is not a vertex!")
+    offsets, neighbours, costs = frozen.get_arrays()
+    s = frozen.index_of(start)
+    component, sources, positions = _component_edges(frozen, s)
+    sets = UnionFind(frozen.nr_of_vertices())
+    tree = {x: [] for x in component}
+    nr_of_components = len(component)
+    edges = list(range(len(positions)))      # the edges between different components
+    while nr_of_components > 1:
+        cheapest = dict()         # the root of a component -> its cheapest outgoing edge
+        remaining = []
+        for i in edges:
+            rx, ry = sets.find(sources[i]), sets.find(neighbours[positions[i]])
+            if rx == ry:
+                continue
+            remaining.append(i)
+            key = (costs[positions[i]], i)
+            if rx not in cheapest or key < cheapest[rx]:
+                cheapest[rx] = key
+            if ry not in cheapest or key < cheapest[ry]:
+                cheapest[ry] = key
+        edges = remaining
+        for c, i in cheapest.values():
+            x, y = sources[i], neighbours[positions[i]]
+            if sets.union(x, y):
+                tree[x].append(y)
+                tree[y].append(x)
+                nr_of_components -= 1
+    return _oriented_tree(frozen, s, tree)
+
+
+def _edge_arrays(frozen):
+    # returns (first, second, costs): the i-th edge of the frozen view is first[i] - second[i] (as indices, with
+    # first[i] < second[i], so every edge is taken once and the loops are left out) and has the cost costs[i]
+    offsets, neighbours, all_costs = frozen.get_arrays()
+    first, second, costs = array('q'), array('q'), array('q')
+    for x in range(frozen.nr_of_vertices()):
+        for position in range(offsets[x], offsets[x + 1]):
+            if x < neighbours[position]:
+                first.append(x)
+                second.append(neighbours[position])
+                costs.append(all_costs[position])
+    return first, second, costs
+
+
+BORUVKA_PARALLEL_EDGES = 1 << 16    # the smallest number of edges of a round which is split between processes
+
+
+def _cheapest_edges(sources, targets, costs, ids, begin, end):
+    '''
+    For the edges on the positions begin, ..., end-1 of the arrays of a round of minimum_spanning_forest (whose
+endpoints are the components which they join), returns a dictionary from every component to the (cost, id) of its
+cheapest edge. The ids break the ties, so that all the components agree on a single order of the edges.
+    '''
+    cheapest = dict()
+    for i in range(begin, end):
+        key = (costs[i], ids[i])
+        x, y = sources[i], targets[i]
+        if x not in cheapest or key < cheapest[x]:
+            cheapest[x] = key
+        if y not in cheapest or key < cheapest[y]:
+            cheapest[y] = key
+    return cheapest
+
+
+# the state of a worker process of minimum_spanning_forest, set by _attach_edge_arrays: (the shared block, the views
+# of the sources, targets, costs and ids arrays over it)
+_shared_edges = None
+
+
+def _attach_edge_arrays(name, m):
+    # the initializer of the worker processes: the four arrays of the edges are viewed in the shared memory block
+    global _shared_edges
+    memory = shared_memory.SharedMemory(name=name)
+    words = memory.buf.cast('q')
+    _shared_edges = (memory,) + tuple(words[i * m:(i + 1) * m] for i in range(4))
+
+
+def _shared_cheapest_edges(chunk):
+    # the task of a worker process: the cheapest edges of the components, among the edges of a chunk of positions
+    memory, sources, targets, costs, ids = _shared_edges
+    return _cheapest_edges(sources, targets, costs, ids, *chunk)
+
+
+def minimum_spanning_forest(graph, processes=1):
+    '''
+    Returns a minimum spanning forest of the graph, with Boruvka's algorithm: a minimum spanning tree for every
+connected component (unlike prims_algorithm, which finds only the tree of the component of its start vertex). The
+result is in the format of prims_algorithm: the tree of every component is oriented from its first vertex, and the
+trees are listed in the order of those vertices.
+    The edges of a round are kept in four arrays (the two components which an edge joins, its cost and its id). The
+cheapest edge of every component is found in chunks of these arrays, which are split between the worker processes
+when there are many edges (the arrays are in a block of shared memory, so only the positions of the chunks
+are sent to the workers). After the cheapest edges are added, the components are contracted: the edges inside a
+component are dropped, and of the parallel edges between two components only the cheapest one is kept.
+    '''
+    frozen = graph.freeze()
+    n = frozen.nr_of_vertices()
+    first, second, costs = _edge_arrays(frozen)
+    m = len(first)
+    memory = pool = None
+    if processes > 1 and m >= BORUVKA_PARALLEL_EDGES:
+        memory = shared_memory.SharedMemory(create=True, size=max(1, 32 * m))
+        words = memory.buf.cast('q')
+        arrays = [words[i * m:(i + 1) * m] for i in range(4)]
+        arrays[0][:] = first
+        arrays[1][:] = second
+        arrays[2][:] = costs
+        arrays[3][:] = array('q', range(m))
+        pool = multiprocessing.Pool(processes, _attach_edge_arrays, (memory.name, m))
+    else:
+        arrays = [array('q', first), array('q', second), array('q', costs), array('q', range(m))]
+    sources, targets, round_costs, ids = arrays
+    sets = UnionFind(n)
+    tree = dict()
+    nr_of_edges = m           # the number of edges of the current round, at the beginning of the arrays
+    try:
+        while nr_of_edges > 0:
+            if pool is not None and nr_of_edges >= BORUVKA_PARALLEL_EDGES:
+                chunk_size = -(-nr_of_edges // processes)
+                chunks = [(i, min(i + chunk_size, nr_of_edges)) for i in range(0, nr_of_edges, chunk_size)]
+                cheapest = dict()
+                for result in pool.map(_shared_cheapest_edges, chunks):
+                    for x, key in result.items():
+                        if x not in cheapest or key < cheapest[x]:
+                            cheapest[x] = key
+            else:
+                cheapest = _cheapest_edges(sources, targets, round_costs, ids, 0, nr_of_edges)
+            for c, i in set(cheapest.values()):
+                if sets.union(first[i], second[i]):
+                    tree.setdefault(first[i], []).append(second[i])
+                    tree.setdefault(second[i], []).append(first[i])
+            # the contraction: the cheapest edge between every two components, with the components as endpoints
+            kept = dict()
+            for i in range(nr_of_edges):
+                x, y = sets.find(sources[i]), sets.find(targets[i])
+                if x == y:
+                    continue
+                if x > y:
+                    x, y = y, x
+                key = (round_costs[i], ids[i])
+                if (x, y) not in kept or key < kept[(x, y)]:
+                    kept[(x, y)] = key
+            for i, ((x, y), (c, edge_id)) in enumerate(kept.items()):
+                sources[i], targets[i], round_costs[i], ids[i] = x, y, c, edge_id
+            nr_of_edges = len(kept)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+            del sources, targets, round_costs, ids, arrays, words
+            memory.close()
+            memory.unlink()
+    edges = []
+    listed = set()        # the roots (in sets) of the components whose tree is already in edges
+    for x in range(n):
+        if x in tree and sets.find(x) not in listed:
+            listed.add(sets.find(x))
+            edges.extend(_oriented_tree(frozen, x, tree))
+    return edges
+
+
+# the engines of minimum_spanning_tree, by name
+MST_ENGINES = {'prim': indexed_prims_algorithm, 'dense': dense_prims_algorithm, 'kruskal': kruskals_algorithm,
+               'boruvka': boruvkas_algorithm}
+
+DENSE_PRIM_MIN_VERTICES = 64    # the smallest graph (in vertices) for which choose_mst_engine looks at the density
+
+
+def choose_mst_engine(graph):
+    '''
+    Chooses the name of the fastest engine for the graph, from n, m and the costs:
+        - dense_prims_algorithm, when m is close to n^2 (at least n^2 / 8 edges) and the graph has at least
+    DENSE_PRIM_MIN_VERTICES vertices, since its O(n^2) scans cost less than the heap operations of one relaxation per
+    edge (for a few vertices, or none, every engine is fast and n^2 / 8 is reached by a handful of edges);
+        - kruskals_algorithm, for sparse graphs (less than 4 edges per vertex) and for graphs with few different costs
+    (at most one for every 16 edges), where the sort is cheap and most edges are never looked at;
+        - indexed_prims_algorithm, otherwise.
+    '''
+    frozen = graph.freeze()
+    n = frozen.nr_of_vertices()
+    m = len(frozen.get_arrays()[1]) // 2
+    if n >= DENSE_PRIM_MIN_VERTICES and m >= n * n // 8:
+        return 'dense'
+    if m < 4 * n or 16 * len(set(frozen.get_arrays()[2])) <= m:
+        return 'kruskal'
+    return 'prim'
+
+
+def minimum_spanning_tree(graph, start, engine=None):
+    '''
+    Returns the minimum spanning tree of the component of start, in the format of prims_algorithm, computed by the
+engine chosen by choose_mst_engine, or by the given engine (one of the names of MST_ENGINES).
+    '''
+    if engine is None:
+        engine = choose_mst_engine(graph)
+    if engine not in MST_ENGINES:
+        raise ValueError("Unknown engine: " + str(engine))
+    return MST_ENGINES[engine](graph, start)
+
+
+class LinkCutTree:
+    '''
+    A link-cut tree (Sleator and Tarjan): a forest of the nodes 0, 1, 2, ..., each with a value, which supports link,
+cut, connected and path_max (the node of maximum value on the path between two nodes) in O(log n) amortized time.
+Every tree is split into preferred paths, and every path is kept in a splay tree ordered by depth:
+        > self._left[x], self._right[x] = the children of x in its splay tree (-1 if there is none);
+        > self._parent[x] = the parent of x in its splay tree or, for the root of a splay tree, the node above the
+whole path in the represented tree (-1 if there is none);
+        > self._flip[x] = True if the subtree of x has to be reversed (make_root reverses a path lazily);
+        > self._max[x] = the node of maximum value in the splay subtree of x.
+    '''
+    def __init__(self):
+        self._left = []
+        self._right = []
+        self._parent = []
+        self._flip = []
+        self._value = []
+        self._max = []
+
+    def add_node(self, value):
+        # adds a node which is alone in its tree and returns it
+        x = len(self._value)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._parent.append(-1)
+        self._flip.append(False)
+        self._value.append(value)
+        self._max.append(x)
+        return x
+
+    def get_value(self, x):
+        return self._value[x]
+
+    def set_value(self, x, value):
+        self._access(x)
+        self._value[x] = value
+        self._update(x)
+
+    def _is_splay_root(self, x):
+        p = self._parent[x]
+        return p == -1 or (self._left[p] != x and self._right[p] != x)
+
+    def _update(self, x):
+        best = x
+        for child in (self._left[x], self._right[x]):
+            if child != -1 and self._value[self._max[child]] > self._value[best]:
+                best = self._max[child]
+        self._max[x] = best
+
+    def _push(self, x):
+        if self._flip[x]:
+            self._left[x], self._right[x] = self._right[x], self._left[x]
+            for child in (self._left[x], self._right[x]):
+                if child != -1:
+                    self._flip[child] = not self._flip[child]
+            self._flip[x] = False
+
+    def _rotate(self, x):
+        left, right, parent = self._left, self._right, self._parent
+        p = parent[x]
+        g = parent[p]
+        if not self._is_splay_root(p):
+            if left[g] == p:
+                left[g] = x
+            else:
+                right[g] = x
+        if left[p] == x:
+            left[p] = right[x]
+            if right[x] != -1:
+                parent[right[x]] = p
+            right[x] = p
+        else:
+            right[p] = left[x]
+            if left[x] != -1:
+                parent[left[x]] = p
+            left[x] = p
+        parent[p] = x
+        parent[x] = g
+        self._update(p)
+        self._update(x)
+
+    def _splay(self, x):
+        path = [x]
+        while not self._is_splay_root(path[-1]):
+            path.append(self._parent[path[-1]])
+        for y in reversed(path):
+            self._push(y)
+        while not self._is_splay_root(x):
+            p = self._parent[x]
+            if not self._is_splay_root(p):
+                g = self._parent[p]
+                self._rotate(p if (self._left[g] == p) == (self._left[p] == x) else x)
+            self._rotate(x)
+
+    def _access(self, x):
+        # makes the path from the root of the tree to x preferred; x ends as the root of its splay tree
+        last = -1
+        y = x
+        while y != -1:
+            self._splay(y)
+            self._right[y] = last
+            self._update(y)
+            last = y
+            y = self._parent[y]
+        self._splay(x)
+
+    def make_root(self, x):
+        self._access(x)
+        self._flip[x] = not self._flip[x]
+
+    def find_root(self, x):
+        self._access(x)
+        self._push(x)
+        while self._left[x] != -1:
+            x = self._left[x]
+            self._push(x)
+        self._splay(x)
+        return x
+
+    def connected(self, x, y):
+        return x == y or self.find_root(x) == self.find_root(y)
+
+    def link(self, x, y):
+        # adds the edge x - y; x and y must be in different trees
+        self.make_root(x)
+        self._parent[x] = y
+
+    def cut(self, x, y):
+        # removes the edge x - y, which must be in the forest
+        self.make_root(x)
+        self._access(y)
+        self._left[y] = -1
+        self._parent[x] = -1
+        self._update(y)
+
+    def path_max(self, x, y):
+        # the node of maximum value on the path between x and y, which must be in the same tree
+        self.make_root(x)
+        self._access(y)
+        return self._max[y]
+
+
+class DynamicMinimumSpanningForest:
+    '''
+    A minimum spanning forest of an UndirectedGraph, kept up to date while the edges of the graph change. It is seeded
+from minimum_spanning_forest, and then the edges are changed through add_vertex, add_edge, remove_edge and
+modify_cost of the forest, which change the graph and then repair the forest:
+        - a new edge, or a cheaper edge which is not in the forest, replaces the most expensive edge on the cycle that
+    it closes in the forest, if it is cheaper than that edge; the cycle is found in a LinkCutTree, in which every edge
+    of the forest is a node (whose value is its cost) between the nodes of its endpoints, in O(log n) amortized time;
+        - a removed edge of the forest, or a more expensive one, is cut and the cheapest edge of the graph between the
+    two trees is added back (this replacement search visits the smaller of the two trees and the edges of its
+    vertices).
+    So only the insertions and the cost decreases take polylogarithmic time: a deletion of an edge of the forest, or
+a cost increase of one, costs O(n + m) in the worst case (when the smaller tree holds half of the vertices and most
+of the edges), not the O(log^2 n) amortized bound of the levels of Holm, de Lichtenberg and Thorup (see
+DynamicConnectivity in lab 2), which the forest does not keep. The deletions and the cost increases of the edges which
+are not in the forest do not change it.
+    If the graph is modified in another way, its version changes and the forest is computed again from scratch at
+the next query.
+    '''
+    def __init__(self, graph):
+        self._graph = graph
+        self._rebuild()
+
+    def _rebuild(self):
+        self._links = LinkCutTree()
+        self._node = dict()           # vertex -> its node in self._links
+        self._edge_node = dict()      # (x, y) -> the node of the edge of the forest x - y, with both orientations
+        self._edge_of = dict()        # the node of an edge of the forest -> the edge (x, y)
+        self._free_nodes = []         # the nodes of the edges which left the forest, which are reused by _link
+        self._tree_neighbours = dict()
+        self._total_cost = 0
+        for vertex in self._graph.get_all_vertices():
+            self._add_vertex_node(vertex)
+        for x, y in minimum_spanning_forest(self._graph):
+            self._link(x, y)
+        self._version = self._graph.get_version()
+
+    def _check_version(self):
+        if self._version != self._graph.get_version():
+            self._rebuild()
+
+    def _add_vertex_node(self, vertex):
+        self._node[vertex] = self._links.add_node(float('-inf'))
+        self._tree_neighbours[vertex] = set()
+
+    def _link(self, x, y):
+        c = self._graph.get_cost(x, y)
+        if len(self._free_nodes) > 0:
+            node = self._free_nodes.pop()
+            self._links.set_value(node, c)
+        else:
+            node = self._links.add_node(c)
+        self._links.link(self._node[x], node)
+        self._links.link(node, self._node[y])
+        self._edge_node[(x, y)] = self._edge_node[(y, x)] = node
+        self._edge_of[node] = (x, y)
+        self._tree_neighbours[x].add(y)
+        self._tree_neighbours[y].add(x)
+        self._total_cost += c
+
+    def _cut(self, x, y):
+        # removes the edge x - y from the forest (its node is left alone in the LinkCutTree)
+        node = self._edge_node.pop((x, y))
+        del self._edge_node[(y, x)]
+        del self._edge_of[node]
+        self._links.cut(self._node[x], node)
+        self._links.cut(node, self._node[y])
+        self._tree_neighbours[x].discard(y)
+        self._tree_neighbours[y].discard(x)
+        self._total_cost -= self._links.get_value(node)
+        self._free_nodes.append(node)
+
+    def _insert(self, x, y, c):
+        # the edge x - y of cost c is not in the forest, but it could replace the most expensive edge of its cycle
+        if x == y:
+            return
+        if not self._links.connected(self._node[x], self._node[y]):
+            self._link(x, y)
+            return
+        node = self._links.path_max(self._node[x], self._node[y])
+        if self._links.get_value(node) > c:
+            self._cut(*self._edge_of[node])
+            self._link(x, y)
+
+    def _replace(self, x, y):
+        '''
+        x and y are in different trees of the forest, after an edge between them was cut: the cheapest edge of the
+    graph between the two trees, if there is one, is added to the forest. The two trees are traversed together,
+    one vertex at a time, so that only the smaller one is traversed completely.
+        '''
+        sides = [[x], [y]]
+        visited = [{x}, {y}]
+        positions = [0, 0]
+        while positions[0] < len(sides[0]) and positions[1] < len(sides[1]):
+            for i in (0, 1):
+                u = sides[i][positions[i]]
+                positions[i] += 1
+                for v in self._tree_neighbours[u]:
+                    if v not in visited[i]:
+                        visited[i].add(v)
+                        sides[i].append(v)
+        smaller = visited[0] if positions[0] == len(sides[0]) else visited[1]
+        best = None
+        for u in smaller:
+            for v in self._graph.parse_adjacent_vertices(u):
+                if v not in smaller:
+                    c = self._graph.get_cost(u, v)
+                    if best is None or c < best[0]:
+                        best = (c, u, v)
+        if best is not None:
+            self._link(best[1], best[2])
+
+    def add_vertex(self, x):
+        self._check_version()
+        self._graph.add_vertex(x)
+        self._add_vertex_node(x)
+        self._version = self._graph.get_version()
+
+    def add_edge(self, x, y, c):
+        self._check_version()
+        if self._graph.is_edge(x, y):
+            return
+        self._graph.add_edge(x, y, c)
+        self._version = self._graph.get_version()
+        self._insert(x, y, c)
+
+    def remove_edge(self, x, y):
+        self._check_version()
+        self._graph.remove_edge(x, y)
+        self._version = self._graph.get_version()
+        if (x, y) in self._edge_node:
+            self._cut(x, y)
+            self._replace(x, y)
+
+    def modify_cost(self, x, y, c):
+        self._check_version()
+        self._graph.modify_cost(x, y, c)
+        self._version = self._graph.get_version()
+        if (x, y) not in self._edge_node:
+            self._insert(x, y, c)
+            return
+        node = self._edge_node[(x, y)]
+        if c <= self._links.get_value(node):
+            # a cheaper edge of the forest stays in the forest
+            self._total_cost += c - self._links.get_value(node)
+            self._links.set_value(node, c)
+        else:
+            self._cut(x, y)
+            self._replace(x, y)
+
+    def get_edges(self):
+        # the edges of the forest, in the format of minimum_spanning_forest
+        self._check_version()
+        edges = []
+        visited = set()
+        for vertex in self._graph.get_all_vertices():
+            if vertex in visited or len(self._tree_neighbours[vertex]) == 0:
+                continue
+            visited.add(vertex)
+            queue = deque([vertex])
+            while len(queue) > 0:
+                x = queue.popleft()
+                for y in self._tree_neighbours[x]:
+                    if y not in visited:
+                        visited.add(y)
+                        edges.append((x, y))
+                        queue.append(y)
+        return edges
+
+    def get_total_cost(self):
+        self._check_version()
+        return self._total_cost
+
+
+def _tie_classes(frozen):
+    '''
+    Splits the edges of the graph into tie classes, by cost. All the minimum spanning forests have the same
+components after the edges cheaper than a cost c, so the edges of cost c which they contain always join the same
+components, whatever was chosen among the cheaper edges: the forest is any spanning forest of the multigraph whose
+nodes are those components and whose edges are the edges of cost c between different components.
+    Returns the list of these multigraphs, as (the number of nodes, the list of the (node, node) edges, the list of
+the (x, y) edges of the graph which they stand for), only for the classes which have at least one such edge.
+    '''
+    first, second, costs = _edge_arrays(frozen)
+    order = sorted(range(len(first)), key=costs.__getitem__)
+    sets = UnionFind(frozen.nr_of_vertices())
+    vertex_at = frozen.vertex_at
+    classes = []
+    begin = 0
+    while begin < len(order):
+        end = begin
+        while end < len(order) and costs[order[end]] == costs[order[begin]]:
+            end += 1
+        node = dict()          # the root of a component -> its node in the multigraph of the class
+        edges = []
+        graph_edges = []
+        for i in order[begin:end]:
+            x, y = sets.find(first[i]), sets.find(second[i])
+            if x != y:
+                edges.append((node.setdefault(x, len(node)), node.setdefault(y, len(node))))
+                graph_edges.append((vertex_at(first[i]), vertex_at(second[i])))
+        for i in order[begin:end]:
+            sets.union(first[i], second[i])
+        if len(edges) > 0:
+            classes.append((len(node), edges, graph_edges))
+        begin = end
+    return classes
+
+
+def _determinant(matrix):
+    # the determinant of a square matrix of integers, with the fraction-free elimination of Bareiss (exact)
+    matrix = [row[:] for row in matrix]
+    n = len(matrix)
+    sign = 1
+    previous = 1
+    for k in range(n - 1):
+        if matrix[k][k] == 0:
+            swap = next((i for i in range(k + 1, n) if matrix[i][k] != 0), None)
+            if swap is None:
+                return 0
+            matrix[k], matrix[swap] = matrix[swap], matrix[k]
+            sign = -sign
+        for i in range(k + 1, n):
+            for j in range(k + 1, n):
+                matrix[i][j] = (matrix[i][j] * matrix[k][k] - matrix[i][k] * matrix[k][j]) // previous
+        previous = matrix[k][k]
+    return sign * matrix[n - 1][n - 1] if n > 0 else 1
+
+
+def _count_spanning_forests(nr_of_nodes, edges):
+    '''
+    The number of spanning forests of a multigraph: by Kirchhoff's theorem, the number of spanning trees of every
+connected component is any cofactor of its Laplacian matrix (degrees on the diagonal, minus the number of edges
+between two nodes outside it), and the counts of the components are multiplied. A multigraph without cycles is its
+own single spanning forest, so it is not counted with determinants.
+    '''
+    sets = UnionFind(nr_of_nodes)
+    has_cycles = False
+    for x, y in edges:
+        if not sets.union(x, y):
+            has_cycles = True
+    if not has_cycles:
+        return 1
+    components = dict()       # the root of a component -> (the positions of its nodes except one, its edges)
+    for x in range(nr_of_nodes):
+        positions = components.setdefault(sets.find(x), (dict(), []))[0]
+        if x != sets.find(x):
+            positions[x] = len(positions)
+    for x, y in edges:
+        components[sets.find(x)][1].append((x, y))
+    count = 1
+    for positions, component_edges in components.values():
+        laplacian = [[0] * len(positions) for i in range(len(positions))]
+        for x, y in component_edges:
+            for u, v in ((x, y), (y, x)):
+                if u in positions:
+                    laplacian[positions[u]][positions[u]] += 1
+                    if v in positions:
+                        laplacian[positions[u]][positions[v]] -= 1
+        count *= _determinant(laplacian)
+    return count
+
+
+def count_minimum_spanning_trees(graph):
+    '''
+    Returns the number of minimum spanning trees of the graph (of minimum spanning forests, if the graph is not
+connected): the product, over the tie classes (see _tie_classes), of the number of spanning forests of their
+multigraphs.
+    '''
+    count = 1
+    for nr_of_nodes, edges, graph_edges in _tie_classes(graph.freeze()):
+        count *= _count_spanning_forests(nr_of_nodes, edges)
+    return count
+
+
+def _spanning_forests(nr_of_nodes, edges):
+    '''
+    Generates the spanning forests of a multigraph, as tuples of positions in edges, by splitting on every edge in
+turn: the forests which contain it (if it does not close a cycle with the edges already chosen) and the forests which
+do not contain it (if the chosen edges and the edges after it still connect every component). Both checks are made
+before going down, so every branch gives at least one forest and the time between two forests is polynomial. The
+search is kept on an explicit stack of (the next edge, the parents of the chosen edges' UnionFind, the chosen edges).
+    '''
+    def find(parent, x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    full = list(range(nr_of_nodes))
+    for x, y in edges:
+        rx, ry = find(full, x), find(full, y)
+        if rx != ry:
+            full[rx] = ry
+    nr_of_components = sum(1 for x in range(nr_of_nodes) if full[x] == x)
+    stack = [(0, list(range(nr_of_nodes)), ())]
+    while len(stack) > 0:
+        i, parent, chosen = stack.pop()
+        if i == len(edges):
+            yield chosen
+            continue
+        # without the edge i: the chosen edges and the edges after it must still connect every component
+        rest = parent[:]
+        for x, y in edges[i + 1:]:
+            rx, ry = find(rest, x), find(rest, y)
+            if rx != ry:
+                rest[rx] = ry
+        if sum(1 for x in range(nr_of_nodes) if rest[x] == x) == nr_of_components:
+            stack.append((i + 1, parent, chosen))
+        # with the edge i: it must not close a cycle
+        rx, ry = find(parent, edges[i][0]), find(parent, edges[i][1])
+        if rx != ry:
+            parent = parent[:]
+            parent[rx] = ry
+            stack.append((i + 1, parent, chosen + (i,)))
+
+
+def all_minimum_spanning_trees(graph):
+    '''
+    A generator of all the minimum spanning trees of the graph (minimum spanning forests, if the graph is not
+connected), each of them as a list of (x, y) edges. Every tree is a choice of a spanning forest in every tie class
+(see _tie_classes), so the generator goes through all the combinations like an odometer, with one generator of
+_spanning_forests for every class; only the current forest of every class is kept in memory. The classes with a
+single forest (the most common case) are chosen once, outside the odometer.
+    '''
+    fixed = []
+    classes = []
+    for nr_of_nodes, edges, graph_edges in _tie_classes(graph.freeze()):
+        if _count_spanning_forests(nr_of_nodes, edges) == 1:
+            fixed.extend(graph_edges[i] for i in next(_spanning_forests(nr_of_nodes, edges)))
+        else:
+            classes.append((nr_of_nodes, edges, graph_edges))
+    if len(classes) == 0:
+        yield fixed
+        return
+    generators = [_spanning_forests(*classes[0][:2])]
+    chosen = []
+    while len(generators) > 0:
+        forest = next(generators[-1], None)
+        if forest is None:
+            generators.pop()
+            if len(chosen) > 0:
+                chosen.pop()
+            continue
+        graph_edges = classes[len(generators) - 1][2]
+        chosen.append([graph_edges[i] for i in forest])
+        if len(generators) == len(classes):
+            yield fixed + list(chain.from_iterable(chosen))
+            chosen.pop()
+        else:
+            generators.append(_spanning_forests(*classes[len(generators)][:2]))
+
+
+class MinimumSpanningTreeCache:
+    '''
+    Keeps the minimum spanning trees already computed for a graph. The cost of a minimum spanning tree does not
+depend on its start vertex, so minimum_spanning_tree runs only once for every connected component and the tree is then
+re-rooted at any start vertex of that component in O(n):
+        > self._component_of[x] = the position in self._trees of the tree which contains the vertex x;
+        > self._trees[i] = a dictionary in which every key is a vertex of the tree and the value is the list of its
+(neighbour, cost) pairs in the tree.
+    The trees are kept together with the version of the graph, and they are dropped as soon as the graph changes.
+    '''
+    def __init__(self, graph):
+        self._graph = graph
+        self._version = graph.get_version()
+        self._component_of = dict()
+        self._trees = []
+
+    def clear(self):
+        self._component_of.clear()
+        self._trees.clear()
+
+    def get_tree(self, start):
+        '''
+        Returns the minimum spanning tree of the component of start, as a list of (x, y, cost) edges oriented away
+    from start: like in the result of prims_algorithm, the vertex x of every edge is start or it appears in an
+    earlier edge.
+        '''
+        if self._version != self._graph.get_version():
+            self.clear()
+            self._version = self._graph.get_version()
+        if self._graph.is_vertex(start) is False:
+            raise ValueError("This is not a vertex!")
+        if start not in self._component_of:
+            tree = {start: []}
+            for x, y in minimum_spanning_tree(self._graph, start):
+                c = self._graph.get_cost(x, y)
+                tree.setdefault(x, []).append((y, c))
+                tree.setdefault(y, []).append((x, c))
+            for vertex in tree:
+                self._component_of[vertex] = len(self._trees)
+            self._trees.append(tree)
+        tree = self._trees[self._component_of[start]]
+        # a breadth-first traversal of the tree, from start
+        edges = []
+        visited = {start}
+        queue = deque([start])
+        while len(queue) > 0:
+            x = queue.popleft()
+            for y, c in tree[x]:
+                if y not in visited:
+                    visited.add(y)
+                    edges.append((x, y, c))
+                    queue.append(y)
+        return edges
+
+
+def get_minimum_spanning_tree(graph, start, cache=None):
+    # cache = a MinimumSpanningTreeCache of the graph, which gives the tree and the costs of its edges
+    if cache is None:
+        result_edges = [(x, y, graph.get_cost(x, y)) for x, y in minimum_spanning_tree(graph, start)]
+    else:
+        result_edges = cache.get_tree(start)
     total_cost = 0
     print("The minimum spanning tree is formed by the following edges: ")
-    for edge in result_edges:
-        print(edge)
-        total_cost += graph.get_cost(edge[0], edge[1])
+    for x, y, c in result_edges:
+        print((x, y))
+        total_cost += c
     print("Total cost is: " + str(total_cost))
 
 
+def get_all_minimum_spanning_trees(graph):
+    print("The graph has " + str(count_minimum_spanning_trees(graph)) + " minimum spanning trees:")
+    for i, edges in enumerate(all_minimum_spanning_trees(graph)):
+        print(str(i + 1) + ": " + str(edges))
+
+
 def run():
     while True:
         filename = input("Enter the filename. Press x for exit. \n Filename: > ")
         if filename == 'x':
             return
         graph = read_graph_from_file(filename)
+        # the trees of this graph are computed once and re-rooted for every start vertex
+        cache = MinimumSpanningTreeCache(graph)
 
         while True:
             print("Find the minimum spanning tree. Press x for exit.")
-            start = input("Enter the start vertex: > ")
+            start = input("Enter the start vertex (or all, to list every minimum spanning tree): > ")
             if start == 'x':
                 break
-            get_minimum_spanning_tree(graph, int(start))
+            if start == 'all':
+                get_all_minimum_spanning_trees(graph)
+            else:
+                get_minimum_spanning_tree(graph, int(start), cache)
 
 
-run()
+# the worker processes of minimum_spanning_forest may import this file, so the program runs only when it is the main
+# module
+if __name__ == '__main__':
+    run()
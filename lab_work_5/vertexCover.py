@@ -1,4 +1,11 @@
 import heapq
+import os
+import sys
+
+# the graph files (the text formats of read_graph_from_file) are shared by all the labs
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph_files import parse_graph_file
 
 
 class UndirectedGraph:
@@ -21,6 +28,24 @@ class UndirectedGraph:
             self._dictNeighbours[y].append(x)
             self._dictCost[(x, y)] = c
 
+    def add_edges(self, sources, targets, costs):
+        '''
+        Adds many edges at once: the i-th edge is sources[i] - targets[i] and has the cost costs[i]. Like in
+    add_edge, an edge which is already in the graph (in any direction) is skipped, but the check is made against a
+    set of all the edges, built once for the whole batch, instead of searching the lists of neighbours for every
+    edge.
+        '''
+        dict_neighbours = self._dictNeighbours
+        dict_cost = self._dictCost
+        edges = set((x, y) if x <= y else (y, x) for x, y in dict_cost.keys())
+        for x, y, c in zip(sources, targets, costs):
+            edge = (x, y) if x <= y else (y, x)
+            if edge not in edges:
+                edges.add(edge)
+                dict_neighbours[x].append(y)
+                dict_neighbours[y].append(x)
+                dict_cost[(x, y)] = c
+
     def parse_adjacent_vertices(self, x):
         return self._dictNeighbours[x]
 
@@ -51,42 +76,11 @@ class UndirectedGraph:
 
 
 def read_graph_from_file(filename):
-    f = open(filename)
+    vertices, sources, targets, costs = parse_graph_file(filename)
     graph = UndirectedGraph()
-    value = f.readline()
-    value = value[:-1].split(' ')
-    # if the text file contains on the first line 2 values (n and m), that means that the graph has as vertices
-    # all of the numbers in range (0, n)
-    if len(value) == 2:
-        n = int(value[0])
-        m = int(value[1])
-        for i in range(n):
-            graph.add_vertex(i)
-        for i in range(m):
-            value = f.readline()
-            value = value[:-1].split(' ')
-            graph.add_edge(int(value[0]), int(value[1]), int(value[2]))
-    else:
-        # else, the text file contains only the edges and their costs. The isolated vertices were stored with the
-        # format: the_isolated_vertex -1 0
-        while True:
-            try:
-                x = int(value[0])
-                y = int(value[1])
-                cost = int(value[2])
-                if graph.is_vertex(x) is False:
-                    graph.add_vertex(x)
-                if y != -1 and graph.is_vertex(y) is False:
-                    graph.add_vertex(y)
-                if y != -1:
-                    graph.add_edge(x, y, cost)
-                value = f.readline()
-                value = value[:-1].split(' ')
-                if len(value) != 3:
-                    break
-            except EOFError:
-                break
-    f.close()
+    for vertex in vertices:
+        graph.add_vertex(vertex)
+    graph.add_edges(sources, targets, costs)
     return graph
 
 